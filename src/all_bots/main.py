@@ -0,0 +1,34 @@
+import asyncio
+
+from loguru import logger
+
+from utils.config_model import create_config
+from utils.resources import GameResources
+from utils.runner import run_applications
+
+from master_bot.main  import create_app as create_master_app
+from hero_bot.main    import create_app as create_hero_app
+from station_bot.main import create_app as create_station_app
+from color_bot.main   import create_app as create_color_app
+from staff_bot.main   import create_app as create_staff_app
+from gossip_bot.main  import create_app as create_gossip_app
+from doors_bot.main   import create_app as create_doors_app
+
+if __name__ == "__main__":
+    logger.info("Starting now...")
+    resources = GameResources(create_config())
+
+    # Мастер идёт первым: при инициализации он создаёт схему БД
+    apps = [
+        create_master_app(resources),
+        create_hero_app(resources),
+        create_station_app(resources),
+        create_color_app(resources),
+        create_staff_app(resources),
+        create_gossip_app(resources),
+        create_doors_app(resources),
+    ]
+
+    logger.info("Starting all bots in single process...")
+    asyncio.run(run_applications(apps))
+    logger.info("Done! Have a great day!")
@@ -1,7 +1,7 @@
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from sqlalchemy import insert, update as sql_update
+from sqlalchemy import update as sql_update
 
 from loguru import logger
 from datetime import datetime
@@ -9,7 +9,6 @@ from datetime import datetime
 from utils.application  import GameApplication
 from utils.config_model import ColorBotConfig
 from utils.db_model import Hero, HeroSpecialStationLog
-from utils.qr_converter import qr_convert
 
 QR_AWAIT, DICE_AWAIT = 1, 2
 
@@ -73,7 +72,8 @@ async def qr_image_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     async with app.db_session() as session:
         await update.message.reply_markdown(app.config.i18n.qr_processing)
         
-        uuid = await qr_convert(update.message.photo[-1])
+        qr = await app.qr_decoder.decode_photos(update.message.photo)
+        uuid = qr.data
 
         if not uuid:
             logger.warning(f"Color station {chat_id=} got unkonwn uuid")
@@ -145,15 +145,13 @@ async def dice_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
             .values(times_to_visit_colors = hero.times_to_visit_colors)
         )
 
-        await session.execute(
-            insert(HeroSpecialStationLog)
-            .values(
-                timestamp = datetime.now(),
-                station   = app.name,
-                hero_id   = hero.id,
-                wisdom    = hero.wisdom,
-                dice      = dice,
-            )
+        app.log_sink.write(
+            HeroSpecialStationLog,
+            timestamp = datetime.now(),
+            station   = app.name,
+            hero_id   = hero.id,
+            wisdom    = hero.wisdom,
+            dice      = dice,
         )
 
         if hero.times_to_visit_colors > 0:
@@ -3,13 +3,15 @@ from telegram.ext import (
     MessageHandler,
     ConversationHandler
 )
-from telegram.ext.filters import Chat, Text, PHOTO
+from telegram.ext.filters import Chat, PHOTO
 
 from loguru import logger
 
 from utils.application import GameApplication
 from utils.application_builder import GameApplicationBuilder
+from utils.resources import GameResources
 from utils.error_handler import error_handler
+from utils.text_router import TextRouter
 from utils.config_model import ColorBotConfig
 
 from color_bot.interaction import (
@@ -21,9 +23,8 @@ from color_bot.interaction import (
     dice_handler
 )
 
-if __name__ == "__main__":
-    logger.info("Starting now...")
-    app: GameApplication = GameApplicationBuilder().name('color').build()
+def create_app(resources: GameResources|None = None) -> GameApplication:
+    app: GameApplication = GameApplicationBuilder().resources(resources).name('color').build()
     bot_config: ColorBotConfig = app.bot_config
     chat_id = bot_config.chat_id
 
@@ -34,24 +35,31 @@ if __name__ == "__main__":
     app.add_handlers([
         ConversationHandler(
             entry_points = [
-                MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['hero_qr']), qr_start_handler)
+                TextRouter(Chat(chat_id)).on(app.config.buttons_fun_to_i18n['hero_qr'], qr_start_handler)
             ],
             states = {
                 QR_AWAIT: [
                     MessageHandler(Chat(chat_id) & PHOTO, qr_image_handler)
                 ],
                 DICE_AWAIT: [
-                    MessageHandler(Chat(chat_id) & Text(app.dice_keys), dice_handler)
+                    TextRouter(Chat(chat_id)).on(app.dice_keys, dice_handler)
                 ]
             },
             fallbacks = [
                 help_handler,
-                MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['cancel']), cancel_handler)
-            ]
+                TextRouter(Chat(chat_id)).on(app.config.buttons_fun_to_i18n['cancel'], cancel_handler)
+            ],
+            name = 'color',
+            persistent = True
         ),
         help_handler
     ])
 
+    return app
+
+if __name__ == "__main__":
+    logger.info("Starting now...")
+    app = create_app()
     logger.info("Starting bot in polling mode...")
     app.run_polling()
     logger.info("Done! Have a great day!")
\ No newline at end of file
@@ -1,7 +1,7 @@
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from sqlalchemy import insert, update as sql_update
+from sqlalchemy import update as sql_update
 
 from loguru import logger
 from datetime import datetime
@@ -9,7 +9,6 @@ from datetime import datetime
 from utils.application  import GameApplication
 from utils.config_model import DoorsBotConfig
 from utils.db_model import Hero, HeroDoorLog, Monster
-from utils.qr_converter import qr_convert
 
 QR_AWAIT              = 1
 DOOR_TYPE_AWAIT       = 2
@@ -79,7 +78,8 @@ async def qr_image_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     async with app.db_session() as session:
         await update.message.reply_markdown(app.config.i18n.qr_processing)
         
-        uuid = await qr_convert(update.message.photo[-1])
+        qr = await app.qr_decoder.decode_photos(update.message.photo)
+        uuid = qr.data
 
         if not uuid:
             logger.warning(f"Doors station {chat_id=} got unkonwn uuid")
@@ -119,13 +119,11 @@ async def staff_door_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
             reply_markup=app.construct_reply_keyboard_markup(bot_config.staff.buttons)
         )
 
-        await session.execute(
-            insert(HeroDoorLog)
-            .values(
-                timestamp = datetime.now(),
-                hero_id   = hero.id,
-                is_staff  = True
-            )
+        app.log_sink.write(
+            HeroDoorLog,
+            timestamp = datetime.now(),
+            hero_id   = hero.id,
+            is_staff  = True
         )
 
         await session.commit()
@@ -171,20 +169,20 @@ async def answer_correct_handler(update: Update, context: ContextTypes.DEFAULT_T
             reply_markup=app.construct_reply_keyboard_markup(bot_config.correct.buttons)
         )
 
-        await app.gain_hero_xp(hero, xp, {'monster_id': -1}, session)
+        messages = await app.gain_hero_xp(hero, xp, {'monster_id': -1}, session)
 
-        await session.execute(
-            insert(HeroDoorLog)
-            .values(
-                timestamp   = datetime.now(),
-                hero_id     = hero.id,
-                is_question = True,
-                hero_victory    = True
-            )
+        app.log_sink.write(
+            HeroDoorLog,
+            timestamp   = datetime.now(),
+            hero_id     = hero.id,
+            is_question = True,
+            hero_victory    = True
         )
 
         await session.commit()
 
+    await app.send_pending_messages(messages)
+
     return ConversationHandler.END
 
 async def answer_incorrect_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -205,14 +203,12 @@ async def answer_incorrect_handler(update: Update, context: ContextTypes.DEFAULT
             reply_markup=app.construct_reply_keyboard_markup(bot_config.incorrect.buttons)
         )
 
-        await session.execute(
-            insert(HeroDoorLog)
-            .values(
-                timestamp    = datetime.now(),
-                hero_id      = hero.id,
-                is_question  = True,
-                hero_victory = False
-            )
+        app.log_sink.write(
+            HeroDoorLog,
+            timestamp    = datetime.now(),
+            hero_id      = hero.id,
+            is_question  = True,
+            hero_victory = False
         )
 
         await session.commit()
@@ -249,7 +245,8 @@ async def monster_qr_image_handler(update: Update, context: ContextTypes.DEFAULT
     async with app.db_session() as session:
         await update.message.reply_markdown(app.config.i18n.qr_processing)
         
-        uuid = await qr_convert(update.message.photo[-1])
+        qr = await app.qr_decoder.decode_photos(update.message.photo)
+        uuid = qr.data
 
         if not uuid:
             logger.warning(f"Doors station {chat_id=} got unkonwn uuid")
@@ -330,6 +327,7 @@ async def hero_dice_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     logger.info(f"Got hero dice from {chat_id=}")
 
     hero_dice = int(update.message.text)
+    messages  = []
     
     async with app.db_session() as session:
         hero = await app.get_hero_by_id(context.chat_data['hero_id'], session)
@@ -348,14 +346,12 @@ async def hero_dice_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 reply_markup=app.construct_reply_keyboard_markup(bot_config.d1.buttons)
             )
             await app.send_markdown_to_hero(hero, bot_config.d1.hero.format(monster=monster))
-            await session.execute(
-                insert(HeroDoorLog)
-                .values(
-                    timestamp  = datetime.now(),
-                    hero_id    = hero.id,
-                    monster_id = monster.id,
-                    hero_victory   = False
-                )
+            app.log_sink.write(
+                HeroDoorLog,
+                timestamp  = datetime.now(),
+                hero_id    = hero.id,
+                monster_id = monster.id,
+                hero_victory   = False
             )
             conversation_state = ConversationHandler.END
 
@@ -365,16 +361,14 @@ async def hero_dice_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 reply_markup=app.construct_reply_keyboard_markup(bot_config.d20.buttons)
             )
             await app.send_markdown_to_hero(hero, bot_config.d20.hero.format(monster=monster))
-            await app.gain_hero_xp(hero, monster.xp, {'monster_id': monster.id}, session)
-            await session.execute(
-                insert(HeroDoorLog)
-                .values(
-                    timestamp    = datetime.now(),
-                    hero_id      = hero.id,
-                    monster_id   = monster.id,
-                    ability      = context.chat_data['ability'],
-                    hero_victory = True
-                )
+            messages = await app.gain_hero_xp(hero, monster.xp, {'monster_id': monster.id}, session)
+            app.log_sink.write(
+                HeroDoorLog,
+                timestamp    = datetime.now(),
+                hero_id      = hero.id,
+                monster_id   = monster.id,
+                ability      = context.chat_data['ability'],
+                hero_victory = True
             )
             conversation_state = ConversationHandler.END
         
@@ -388,6 +382,8 @@ async def hero_dice_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
         await session.commit()
     
+    await app.send_pending_messages(messages)
+
     return conversation_state
 
 async def monster_dice_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -399,6 +395,7 @@ async def monster_dice_handler(update: Update, context: ContextTypes.DEFAULT_TYP
 
     hero_dice    = context.chat_data['hero_dice']
     monster_dice = int(update.message.text)
+    messages     = []
 
     ability_i18n = context.chat_data['ability_i18n']
     ability      = context.chat_data['ability']
@@ -449,19 +446,19 @@ async def monster_dice_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         await app.send_markdown_to_hero(hero, reply.hero.format(monster=monster))
         
         if hero_victory:
-            await app.gain_hero_xp(hero, monster.xp, {'monster_id': monster.id}, session)
-
-        await session.execute(
-            insert(HeroDoorLog)
-            .values(
-                timestamp    = datetime.now(),
-                hero_id      = hero.id,
-                monster_id   = monster.id,
-                ability      = ability,
-                hero_victory = hero_victory
-            )
+            messages = await app.gain_hero_xp(hero, monster.xp, {'monster_id': monster.id}, session)
+
+        app.log_sink.write(
+            HeroDoorLog,
+            timestamp    = datetime.now(),
+            hero_id      = hero.id,
+            monster_id   = monster.id,
+            ability      = ability,
+            hero_victory = hero_victory
         )
 
         await session.commit()
     
+    await app.send_pending_messages(messages)
+
     return ConversationHandler.END
\ No newline at end of file
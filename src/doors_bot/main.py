@@ -3,13 +3,15 @@ from telegram.ext import (
     MessageHandler,
     ConversationHandler
 )
-from telegram.ext.filters import Chat, Text, PHOTO
+from telegram.ext.filters import Chat, PHOTO
 
 from loguru import logger
 
 from utils.application import GameApplication
 from utils.application_builder import GameApplicationBuilder
+from utils.resources import GameResources
 from utils.error_handler import error_handler
+from utils.text_router import TextRouter
 from utils.config_model import DoorsBotConfig
 
 from doors_bot.interaction import (
@@ -35,9 +37,8 @@ from doors_bot.interaction import (
     monster_dice_handler
 )
 
-if __name__ == "__main__":
-    logger.info("Starting now...")
-    app: GameApplication = GameApplicationBuilder().name('doors').build()
+def create_app(resources: GameResources|None = None) -> GameApplication:
+    app: GameApplication = GameApplicationBuilder().resources(resources).name('doors').build()
     bot_config: DoorsBotConfig = app.bot_config
     chat_id = bot_config.chat_id
 
@@ -48,44 +49,53 @@ if __name__ == "__main__":
     app.add_handlers([
         ConversationHandler(
             entry_points = [
-                MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['hero_qr']), qr_start_handler)
+                TextRouter(Chat(chat_id)).on(app.config.buttons_fun_to_i18n['hero_qr'], qr_start_handler)
             ],
             states = {
                 QR_AWAIT: [
                     MessageHandler(Chat(chat_id) & PHOTO, qr_image_handler)
                 ],
                 DOOR_TYPE_AWAIT: [
-                    MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['staff']),    staff_door_handler),
-                    MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['question']), question_door_handler),
-                    MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['monster']),  monster_start_handler),
+                    TextRouter(Chat(chat_id))
+                    .on(app.config.buttons_fun_to_i18n['staff'],    staff_door_handler)
+                    .on(app.config.buttons_fun_to_i18n['question'], question_door_handler)
+                    .on(app.config.buttons_fun_to_i18n['monster'],  monster_start_handler),
                 ],
                 QUESTION_ANSWER_AWAIT: [
-                    MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['correct']),   answer_correct_handler),
-                    MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['incorrect']), answer_incorrect_handler),
+                    TextRouter(Chat(chat_id))
+                    .on(app.config.buttons_fun_to_i18n['correct'],   answer_correct_handler)
+                    .on(app.config.buttons_fun_to_i18n['incorrect'], answer_incorrect_handler),
                 ],
                 MONSTER_QR_AWAIT: [
                     MessageHandler(Chat(chat_id) & PHOTO, monster_qr_image_handler)
                 ],
                 ABILITY_AWAIT: [
-                    MessageHandler(Chat(chat_id) & Text([
-                            app.config.buttons_fun_to_i18n[key] for key in ['constitution', 'strength', 'dexterity', 'wisdom']
-                        ]), ability_handler),
+                    TextRouter(Chat(chat_id)).on([
+                        app.config.buttons_fun_to_i18n[key] for key in ['constitution', 'strength', 'dexterity', 'wisdom']
+                    ], ability_handler),
                 ],
                 HERO_DICE_AWAIT: [
-                    MessageHandler(Chat(chat_id) & Text(app.dice_keys), hero_dice_handler)
+                    TextRouter(Chat(chat_id)).on(app.dice_keys, hero_dice_handler)
                 ],
                 MONSTER_DICE_AWAIT: [
-                    MessageHandler(Chat(chat_id) & Text(app.dice_keys), monster_dice_handler)
+                    TextRouter(Chat(chat_id)).on(app.dice_keys, monster_dice_handler)
                 ],
             },
             fallbacks = [
                 help_handler,
-                MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['cancel']), cancel_handler)
-            ]
+                TextRouter(Chat(chat_id)).on(app.config.buttons_fun_to_i18n['cancel'], cancel_handler)
+            ],
+            name = 'doors',
+            persistent = True
         ),
         help_handler
     ])
 
+    return app
+
+if __name__ == "__main__":
+    logger.info("Starting now...")
+    app = create_app()
     logger.info("Starting bot in polling mode...")
     app.run_polling()
     logger.info("Done! Have a great day!")
\ No newline at end of file
@@ -10,7 +10,6 @@ from random import choice
 from utils.application  import GameApplication
 from utils.config_model import GossipBotConfig
 from utils.db_model import Hero, KnownVulnerability
-from utils.qr_converter import qr_convert
 
 QR_AWAIT, ACCEPT_AWAIT, DICE_AWAIT = 1, 2, 3
 
@@ -74,7 +73,8 @@ async def qr_image_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     async with app.db_session() as session:
         await update.message.reply_markdown(app.config.i18n.qr_processing)
         
-        uuid = await qr_convert(update.message.photo[-1])
+        qr = await app.qr_decoder.decode_photos(update.message.photo)
+        uuid = qr.data
 
         if not uuid:
             logger.warning(f"Gossip station {chat_id=} got unkonwn uuid")
@@ -2,7 +2,6 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from loguru import logger
-from jinja2 import Template
 
 from utils.application  import GameApplication
 from utils.config_model import HeroBotConfig
@@ -51,7 +50,7 @@ async def help_command_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         if hero.test_done and state == StateEnum.FIGHT:
             logger.info(f"Hero {chat_id=} got fight help")
             await update.message.reply_markdown(
-                Template(bot_config.fight.text).render(hero=hero),
+                app.templates.get(bot_config.fight.text).render(hero=hero),
                 reply_markup=app.construct_reply_keyboard_markup(bot_config.fight.buttons)
             )
             return
@@ -6,8 +6,6 @@ from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from loguru import logger
 
-from jinja2 import Template
-
 from utils.application import GameApplication
 from utils.config_model import HeroBotConfig
 from utils.db_model import Hero, Level, KnownVulnerability
@@ -127,7 +125,7 @@ async def known_vulnerabilities_handler(update: Update, context: ContextTypes.DE
         known_own_vulnerability = known_own_vulnerability_sel.scalar_one_or_none()
 
         await update.message.reply_markdown(
-            Template(bot_config.known_vulnerabilities.text)
+            app.templates.get(bot_config.known_vulnerabilities.text)
             .render(
                 known_vulnerabilities=known_vulnerabilities,
                 known_own_vulnerability=known_own_vulnerability,
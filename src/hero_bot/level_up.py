@@ -1,11 +1,10 @@
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from sqlalchemy import insert, update as sql_update
+from sqlalchemy import update as sql_update
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from loguru import logger
-from jinja2 import Template
 from datetime import datetime
 
 from utils.application import GameApplication
@@ -56,7 +55,7 @@ async def level_up_callback_handler(update: Update, context: ContextTypes.DEFAUL
             return ConversationHandler.END
 
         await update.effective_message.reply_markdown(
-            Template(bot_config.ability_increase_start.text).render(hero=hero),
+            app.templates.get(bot_config.ability_increase_start.text).render(hero=hero),
             reply_markup = app.construct_reply_keyboard_markup(bot_config.ability_increase_start.buttons)
         )
 
@@ -131,13 +130,11 @@ async def ability_increase_handler(update: Update, context: ContextTypes.DEFAULT
                 reply_markup = app.construct_inline_keyboard_markup(bot_config.points_still_awaliable.inline_buttons)
             )
         
-        await session.execute(
-            insert(HeroLevelUpLog)
-            .values(
-                timestamp = datetime.now(),
-                hero_id           = hero.id,
-                increased_ability = ability
-            )
+        app.log_sink.write(
+            HeroLevelUpLog,
+            timestamp = datetime.now(),
+            hero_id           = hero.id,
+            increased_ability = ability
         )
         
         # await app.send_markdown_to_master(f"Клан {hero.id} прокачал характеристику {ability_i18n}")
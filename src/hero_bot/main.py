@@ -1,16 +1,17 @@
 from telegram.ext import (
     CommandHandler,
-    MessageHandler,
     ConversationHandler,
     CallbackQueryHandler
 )
-from telegram.ext.filters import ChatType, Text
+from telegram.ext.filters import ChatType
 
 from loguru import logger
 
 from utils.application import GameApplication
 from utils.application_builder import GameApplicationBuilder
+from utils.resources import GameResources
 from utils.error_handler import error_handler
+from utils.text_router import TextRouter
 
 from hero_bot.help import help_command_handler
 from hero_bot.test import test_start_handler, test_answer_handler
@@ -22,9 +23,8 @@ from hero_bot.level_up import (
     ability_increase_handler
 )
 
-if __name__ == "__main__":
-    logger.info("Starting now...")
-    app: GameApplication = GameApplicationBuilder().name('hero').build()
+def create_app(resources: GameResources|None = None) -> GameApplication:
+    app: GameApplication = GameApplicationBuilder().resources(resources).name('hero').build()
 
     app.add_error_handler(error_handler)
 
@@ -34,31 +34,36 @@ if __name__ == "__main__":
         ],
         states = {
             ABILITY_INCREASE: [
-                MessageHandler(ChatType.GROUPS & Text([
+                TextRouter(ChatType.GROUPS).on([
                     app.config.buttons_fun_to_i18n[key] for key in ['constitution', 'strength', 'dexterity', 'wisdom']
-                ]), ability_increase_handler),
+                ], ability_increase_handler),
             ]
         },
         fallbacks = [
-            MessageHandler(ChatType.GROUPS & Text(app.config.buttons_fun_to_i18n['cancel']), cancel_handler),
-        ]
+            TextRouter(ChatType.GROUPS).on(app.config.buttons_fun_to_i18n['cancel'], cancel_handler),
+        ],
+        name = 'level_up',
+        persistent = True
     ))
 
     app.add_handler(CommandHandler(app.HELP_COMMAND, help_command_handler, filters=ChatType.GROUPS))
 
-    app.add_handlers([
-        MessageHandler(ChatType.GROUPS & Text(app.config.buttons_fun_to_i18n['start']), test_start_handler),
-        MessageHandler(ChatType.GROUPS & Text([
+    app.add_handler(
+        TextRouter(ChatType.GROUPS)
+        .on(app.config.buttons_fun_to_i18n['start'], test_start_handler)
+        .on([
             app.config.buttons_fun_to_i18n[key] for key in ['answer_1', 'answer_2', 'answer_3', 'answer_4']
-        ]), test_answer_handler),
-    ])
+        ], test_answer_handler)
+        .on(app.config.buttons_fun_to_i18n['hero'], hero_info_handler)
+        .on(app.config.buttons_fun_to_i18n['qr'], qr_handler)
+        .on(app.config.buttons_fun_to_i18n['known_vulnerabilities'], known_vulnerabilities_handler)
+    )
 
-    app.add_handlers([
-        MessageHandler(ChatType.GROUPS & Text(app.config.buttons_fun_to_i18n['hero']), hero_info_handler),
-        MessageHandler(ChatType.GROUPS & Text(app.config.buttons_fun_to_i18n['qr']), qr_handler),
-        MessageHandler(ChatType.GROUPS & Text(app.config.buttons_fun_to_i18n['known_vulnerabilities']), known_vulnerabilities_handler),
-    ])
+    return app
 
+if __name__ == "__main__":
+    logger.info("Starting now...")
+    app = create_app()
     logger.info("Starting bot in polling mode...")
     app.run_polling()
     logger.info("Done! Have a great day!")
\ No newline at end of file
@@ -3,7 +3,7 @@ from telegram import Update, Bot
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
-from sqlalchemy import select, insert, update as sql_update
+from sqlalchemy import select, update as sql_update
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from loguru import logger
@@ -107,14 +107,12 @@ async def test_answer_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
             await app.send_markdown_to_master(f"🚨 Внимание! Клан {hero.id} *выслал ответ когда вопросы уже не заданы*")
             return
 
-        await session.execute(
-            insert(HeroTestLog).
-            values(
-                timestamp = datetime.now(),
-                hero_id = hero.id,
-                test_id = hero.curr_test_id,
-                answer  = update.message.text
-            )
+        app.log_sink.write(
+            HeroTestLog,
+            timestamp = datetime.now(),
+            hero_id = hero.id,
+            test_id = hero.curr_test_id,
+            answer  = update.message.text
         )
         await app.send_markdown_to_master(f"Клан {hero.id} *ответил на вопрос {hero.curr_test_id}*")
 
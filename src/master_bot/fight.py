@@ -1,19 +1,18 @@
-import asyncio
 from telegram import Update, Bot
 from telegram.ext import ContextTypes, ConversationHandler
 from telegram.constants import ParseMode
 
-from sqlalchemy import select, update as sql_update, insert
+from sqlalchemy import select, insert, update as sql_update
 
 from loguru import logger
 from random import choice
 from datetime import datetime
-from jinja2 import Template
 
 from utils.application  import GameApplication
 from utils.config_model import MasterBotConfig, FightConfig
-from utils.db_model     import Hero, FightLog, FightToUi, KnownVulnerability
-from utils.custom_types import Fractions
+from utils.db_model     import Hero, Fight, KnownVulnerability
+from utils.custom_types import Fractions, FightSide, FightEventKind
+from utils.fight_record import record_fight_event
 
 INSPIRATION_AWAIT         = 1
 VULNERABILITY_USE_AWAIT   = 2
@@ -25,6 +24,9 @@ ALIANCE_ATTACK_AWAIT      = 7
 HORDE_DEF_AWAIT           = 8
 ALIANCE_DEF_AWAIT         = 9
 
+UI_ROLL_DELAY   = 3
+UI_RESULT_DELAY = 5
+
 async def _reply_error(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     app: GameApplication = context.application
     bot_config: MasterBotConfig = app.bot_config
@@ -112,40 +114,43 @@ async def new_fight_start_handler(update: Update, context: ContextTypes.DEFAULT_
             .values(has_been_in_fight = True)
         )
 
-        await session.execute(
-            insert(FightLog)
+        fight_ins = await session.execute(
+            insert(Fight)
             .values(
-                timestamp         = datetime.now(),
-                horde_hero_id     = horde_hero.id,
-                alliance_hero_id  = alliance_hero.id,
-                horde_health      = horde_hero_health,
-                alliance_health   = alliance_hero_health,
+                started_at       = datetime.now(),
+                horde_hero_id    = horde_hero.id,
+                alliance_hero_id = alliance_hero.id,
             )
+            .returning(Fight.id)
         )
+        context.chat_data['fight_id'] = fight_ins.scalar_one()
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_name =          horde_hero.name,
-                horde_level =         horde_hero.level_id,
-                horde_health =        horde_hero_health,
-                horde_constitution =  horde_hero.constitution,
-                horde_strength =      horde_hero.strength,
-                horde_dexterity =     horde_hero.dexterity,
-                horde_wisdom =        horde_hero.wisdom,
-                horde_bi =            'clock',
-                horde_color =         '#2d2d2d',
-                
-                alliance_name =          alliance_hero.name,
-                alliance_level =         alliance_hero.level_id,
-                alliance_health =        alliance_hero_health,
-                alliance_constitution =  alliance_hero.constitution,
-                alliance_strength =      alliance_hero.strength,
-                alliance_dexterity =     alliance_hero.dexterity,
-                alliance_wisdom =        alliance_hero.wisdom,
-                alliance_bi =            'clock',
-                alliance_color =         '#2d2d2d',
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.HEALTH,
+            horde    = horde_hero_health,
+            alliance = alliance_hero_health,
+        )
+
+        app.scoreboard.publish(
+            horde_name =          horde_hero.name,
+            horde_level =         horde_hero.level_id,
+            horde_health =        horde_hero_health,
+            horde_constitution =  horde_hero.constitution,
+            horde_strength =      horde_hero.strength,
+            horde_dexterity =     horde_hero.dexterity,
+            horde_wisdom =        horde_hero.wisdom,
+            horde_bi =            'clock',
+            horde_color =         '#2d2d2d',
+            
+            alliance_name =          alliance_hero.name,
+            alliance_level =         alliance_hero.level_id,
+            alliance_health =        alliance_hero_health,
+            alliance_constitution =  alliance_hero.constitution,
+            alliance_strength =      alliance_hero.strength,
+            alliance_dexterity =     alliance_hero.dexterity,
+            alliance_wisdom =        alliance_hero.wisdom,
+            alliance_bi =            'clock',
+            alliance_color =         '#2d2d2d',
         )
 
         await session.commit()
@@ -188,7 +193,7 @@ async def inspiration_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
             return await _reply_error(update, context)
 
         await update.message.reply_markdown(
-            Template(bot_config.inspiration.text)
+            app.templates.get(bot_config.inspiration.text)
             .render(
                 horde_hero = horde_hero,
                 horde_inspiration = horde_inspiration,
@@ -198,34 +203,26 @@ async def inspiration_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
 
         await send_to_horde_markdown(bot, fight_config, 
-                                     Template(fight_config.inspiration)
+                                     app.templates.get(fight_config.inspiration)
                                      .render(hero=horde_hero, inspiration=horde_inspiration)
                                      )
 
         await send_to_alliance_markdown(bot, fight_config, 
-                                        Template(fight_config.inspiration)
+                                        app.templates.get(fight_config.inspiration)
                                         .render(hero=alliance_hero, inspiration=alliance_inspiration)
                                         )
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp             = datetime.now(),
-                horde_hero_id         = horde_hero.id,
-                alliance_hero_id      = alliance_hero.id,
-                horde_inspiration     = horde_inspiration,
-                alliance_inspiration  = alliance_inspiration,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.INSPIRATION,
+            horde    = horde_inspiration,
+            alliance = alliance_inspiration,
         )
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_bi =       'stars' if horde_inspiration else None,
-                horde_color =    'blue',
-                alliance_bi =    'stars' if alliance_inspiration else None,
-                alliance_color = 'blue',
-            )
+        app.scoreboard.publish(
+            horde_bi =       'stars' if horde_inspiration else None,
+            horde_color =    'blue',
+            alliance_bi =    'stars' if alliance_inspiration else None,
+            alliance_color = 'blue',
         )
 
         await session.commit()
@@ -263,7 +260,7 @@ async def inspiration_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
         context.chat_data['alliance_know_vulnerability'] = alliance_know_vulnerability
 
         await update.message.reply_markdown(
-            Template(bot_config.vulnerability_use.text)
+            app.templates.get(bot_config.vulnerability_use.text)
             .render(
                 horde_hero = horde_hero,
                 horde_know_vulnerability = horde_know_vulnerability,
@@ -274,26 +271,21 @@ async def inspiration_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
 
         await send_to_horde_markdown(bot, fight_config, 
-                                     Template(fight_config.vulnerability_use)
+                                     app.templates.get(fight_config.vulnerability_use)
                                      .render(hero=horde_hero, enemy = alliance_hero,
                                         know_vulnerability=horde_know_vulnerability)
                                      )
 
         await send_to_alliance_markdown(bot, fight_config, 
-                                     Template(fight_config.vulnerability_use)
+                                     app.templates.get(fight_config.vulnerability_use)
                                      .render(hero=alliance_hero, enemy = horde_hero,
                                         know_vulnerability=alliance_know_vulnerability)
                                      )
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp             = datetime.now(),
-                horde_hero_id         = horde_hero.id,
-                alliance_hero_id      = alliance_hero.id,
-                horde_know_vulnerability    = horde_know_vulnerability,
-                alliance_know_vulnerability = alliance_know_vulnerability,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.KNOW_VULNERABILITY,
+            horde    = horde_know_vulnerability,
+            alliance = alliance_know_vulnerability,
         )
 
         await session.commit()
@@ -335,15 +327,10 @@ async def vulnerability_use_handler(update: Update, context: ContextTypes.DEFAUL
             logger.warning(f"Fight {chat_id=} got unkonwn alliance_hero")
             return await _reply_error(update, context)
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp             = datetime.now(),
-                horde_hero_id         = horde_hero.id,
-                alliance_hero_id      = alliance_hero.id,
-                horde_use_vulnerability     = horde_use_vulnerability,
-                alliance_use_vulnerability  = alliance_use_vulnerability,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.USE_VULNERABILITY,
+            horde    = horde_use_vulnerability,
+            alliance = alliance_use_vulnerability,
         )
 
         horde_own_vulnerability_sel = await session.execute(
@@ -368,7 +355,7 @@ async def vulnerability_use_handler(update: Update, context: ContextTypes.DEFAUL
         context.chat_data['alliance_own_vulnerability'] = alliance_own_vulnerability
 
         await update.message.reply_markdown(
-            Template(bot_config.vulnerability_def.text)
+            app.templates.get(bot_config.vulnerability_def.text)
             .render(
                 horde_hero = horde_hero,
                 horde_own_vulnerability = horde_own_vulnerability,
@@ -379,24 +366,19 @@ async def vulnerability_use_handler(update: Update, context: ContextTypes.DEFAUL
         )
 
         await send_to_horde_markdown(bot, fight_config, 
-                                     Template(fight_config.vulnerability_def)
+                                     app.templates.get(fight_config.vulnerability_def)
                                      .render(hero=horde_hero, own_vulnerability=horde_own_vulnerability)
                                      )
 
         await send_to_alliance_markdown(bot, fight_config, 
-                                     Template(fight_config.vulnerability_def)
+                                     app.templates.get(fight_config.vulnerability_def)
                                      .render(hero=alliance_hero, own_vulnerability=alliance_own_vulnerability)
                                      )
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp             = datetime.now(),
-                horde_hero_id         = horde_hero.id,
-                alliance_hero_id      = alliance_hero.id,
-                horde_own_vulnerability    = horde_own_vulnerability,
-                alliance_own_vulnerability = alliance_own_vulnerability,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.OWN_VULNERABILITY,
+            horde    = horde_own_vulnerability,
+            alliance = alliance_own_vulnerability,
         )
 
         await session.commit()
@@ -462,7 +444,7 @@ async def vulnerability_def_handler(update: Update, context: ContextTypes.DEFAUL
         context.chat_data['alliance_hero_dexterity'] = alliance_hero_dexterity
 
         await send_to_horde_markdown(bot, fight_config, 
-                                     Template(fight_config.vulnerability_result)
+                                     app.templates.get(fight_config.vulnerability_result)
                                      .render(hero=horde_hero, enemy=alliance_hero,
                                              enemy_use_vulnerability=alliance_use_vulnerability,
                                              hero_def_vulnerability=horde_def_vulnerability,
@@ -470,34 +452,26 @@ async def vulnerability_def_handler(update: Update, context: ContextTypes.DEFAUL
                                      )
 
         await send_to_alliance_markdown(bot, fight_config, 
-                                     Template(fight_config.vulnerability_result)
+                                     app.templates.get(fight_config.vulnerability_result)
                                      .render(hero=alliance_hero, enemy=horde_hero,
                                              enemy_use_vulnerability=horde_use_vulnerability,
                                              hero_def_vulnerability=alliance_def_vulnerability,
                                              hero_dexterity=alliance_hero_dexterity)
                                      )
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp             = datetime.now(),
-                horde_hero_id         = horde_hero.id,
-                alliance_hero_id      = alliance_hero.id,
-                horde_def_vulnerability     = horde_def_vulnerability,
-                alliance_def_vulnerability  = alliance_def_vulnerability,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.DEF_VULNERABILITY,
+            horde    = horde_def_vulnerability,
+            alliance = alliance_def_vulnerability,
         )
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_dexterity = horde_hero_dexterity,
-                horde_bi =       'slash-circle' if horde_dexterity_debuf else None,
-                horde_color =    'red',
-                alliance_dexterity = alliance_hero_dexterity,
-                alliance_bi =    'slash-circle' if alliance_dexterity_debuf else None,
-                alliance_color = 'red',
-            )
+        app.scoreboard.publish(
+            horde_dexterity = horde_hero_dexterity,
+            horde_bi =       'slash-circle' if horde_dexterity_debuf else None,
+            horde_color =    'red',
+            alliance_dexterity = alliance_hero_dexterity,
+            alliance_bi =    'slash-circle' if alliance_dexterity_debuf else None,
+            alliance_color = 'red',
         )
 
         await session.commit()
@@ -549,14 +523,9 @@ async def horde_initiatiative_handler(update: Update, context: ContextTypes.DEFA
         context.chat_data['horde_dice']          = dice
         context.chat_data['horde_initiatiative'] = horde_initiatiative
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp        = datetime.now(),
-                horde_hero_id    = horde_hero.id,
-                alliance_hero_id = alliance_hero.id,
-                horde_dice_roll  = dice,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.DICE_ROLL,
+            horde    = dice,
         )
         
         dice_tens = dice//10
@@ -567,13 +536,10 @@ async def horde_initiatiative_handler(update: Update, context: ContextTypes.DEFA
         else:
             roll_bi = f'{dice_ones}-square'
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_dexterity = horde_hero_dexterity,
-                horde_bi =       roll_bi,
-                horde_color =    roll_color,
-            )
+        app.scoreboard.publish(
+            horde_dexterity = horde_hero_dexterity,
+            horde_bi =       roll_bi,
+            horde_color =    roll_color,
         )
 
         await session.commit()
@@ -630,14 +596,9 @@ async def alliance_initiatiative_handler(update: Update, context: ContextTypes.D
         context.chat_data['alliance_dice']          = alliance_dice
         context.chat_data['alliance_initiatiative'] = alliance_initiatiative
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp          = datetime.now(),
-                horde_hero_id      = horde_hero.id,
-                alliance_hero_id   = alliance_hero.id,
-                alliance_dice_roll = alliance_dice,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.DICE_ROLL,
+            alliance = alliance_dice,
         )
         
         dice_tens = dice//10
@@ -648,29 +609,12 @@ async def alliance_initiatiative_handler(update: Update, context: ContextTypes.D
         else:
             roll_bi = f'{dice_ones}-square'
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                alliance_dexterity = alliance_hero_dexterity,
-                alliance_bi =       roll_bi,
-                alliance_color =    roll_color,
-            )
+        app.scoreboard.publish(
+            alliance_dexterity = alliance_hero_dexterity,
+            alliance_bi =       roll_bi,
+            alliance_color =    roll_color,
         )
 
-        await session.commit()
-
-    await asyncio.sleep(3)
-
-    async with app.db_session() as session:
-        horde_hero = await app.get_hero_by_id(context.chat_data['horde_hero_id'], session)
-        if not horde_hero or not type(horde_hero) == Hero:
-            logger.warning(f"Fight {chat_id=} got unkonwn horde_hero")
-            return await _reply_error(update, context)
-        
-        alliance_hero = await app.get_hero_by_id(context.chat_data['alliance_hero_id'], session)
-        if not alliance_hero or not type(alliance_hero) == Hero:
-            logger.warning(f"Fight {chat_id=} got unkonwn alliance_hero")
-            return await _reply_error(update, context)
 
         if horde_initiatiative >= alliance_initiatiative:
             responce  = HORDE_ATTACK_AWAIT
@@ -713,14 +657,11 @@ async def alliance_initiatiative_handler(update: Update, context: ContextTypes.D
             result = alliance_initiatiative
         ))
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_bi       = horde_bi,
-                horde_color    = horde_color,
-                alliance_bi    = alliance_bi,
-                alliance_color = alliance_color,
-            )
+        app.scoreboard.publish_later(app.job_queue, UI_ROLL_DELAY,
+            horde_bi       = horde_bi,
+            horde_color    = horde_color,
+            alliance_bi    = alliance_bi,
+            alliance_color = alliance_color,
         )
 
         await session.commit()
@@ -769,14 +710,9 @@ async def horde_attack_handler(update: Update, context: ContextTypes.DEFAULT_TYP
 
         await update.message.reply_markdown(bot_config.aliance_def.text, reply_markup=app.dice_keyboard)
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp        = datetime.now(),
-                horde_hero_id    = horde_hero.id,
-                alliance_hero_id = alliance_hero.id,
-                horde_dice_roll  = horde_dice,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.DICE_ROLL,
+            horde    = horde_dice,
         )
         
         dice_tens = horde_dice//10
@@ -787,12 +723,9 @@ async def horde_attack_handler(update: Update, context: ContextTypes.DEFAULT_TYP
         else:
             roll_bi = f'{dice_ones}-square'
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_bi =    roll_bi,
-                horde_color = roll_color,
-            )
+        app.scoreboard.publish(
+            horde_bi =    roll_bi,
+            horde_color = roll_color,
         )
 
         await session.commit()
@@ -841,14 +774,9 @@ async def alliance_attack_handler(update: Update, context: ContextTypes.DEFAULT_
 
         await update.message.reply_markdown(bot_config.horde_def.text, reply_markup=app.dice_keyboard)
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp          = datetime.now(),
-                horde_hero_id      = horde_hero.id,
-                alliance_hero_id   = alliance_hero.id,
-                alliance_dice_roll = alliance_dice,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.DICE_ROLL,
+            alliance = alliance_dice,
         )
         
         dice_tens = alliance_dice//10
@@ -859,12 +787,9 @@ async def alliance_attack_handler(update: Update, context: ContextTypes.DEFAULT_
         else:
             roll_bi = f'{dice_ones}-square'
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                alliance_bi =    roll_bi,
-                alliance_color = roll_color,
-            )
+        app.scoreboard.publish(
+            alliance_bi =    roll_bi,
+            alliance_color = roll_color,
         )
 
         await session.commit()
@@ -911,14 +836,9 @@ async def horde_defence_handler(update: Update, context: ContextTypes.DEFAULT_TY
         context.chat_data['horde_dice']    = horde_dice
         context.chat_data['horde_defence'] = horde_defence
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp        = datetime.now(),
-                horde_hero_id    = horde_hero.id,
-                alliance_hero_id = alliance_hero.id,
-                horde_dice_roll  = horde_dice,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.DICE_ROLL,
+            horde    = horde_dice,
         )
         
         dice_tens = horde_dice//10
@@ -929,28 +849,11 @@ async def horde_defence_handler(update: Update, context: ContextTypes.DEFAULT_TY
         else:
             roll_bi = f'{dice_ones}-square'
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_bi =    roll_bi,
-                horde_color = roll_color,
-            )
+        app.scoreboard.publish(
+            horde_bi =    roll_bi,
+            horde_color = roll_color,
         )
 
-        await session.commit()
-    
-    await asyncio.sleep(3)
-
-    async with app.db_session() as session:
-        horde_hero = await app.get_hero_by_id(context.chat_data['horde_hero_id'], session)
-        if not horde_hero or not type(horde_hero) == Hero:
-            logger.warning(f"Fight {chat_id=} got unkonwn horde_hero")
-            return await _reply_error(update, context)
-        
-        alliance_hero = await app.get_hero_by_id(context.chat_data['alliance_hero_id'], session)
-        if not alliance_hero or not type(alliance_hero) == Hero:
-            logger.warning(f"Fight {chat_id=} got unkonwn alliance_hero")
-            return await _reply_error(update, context)
         
         alliance_dice     = context.chat_data['alliance_dice']
         alliance_attack   = context.chat_data['alliance_attack']
@@ -1035,43 +938,38 @@ async def horde_defence_handler(update: Update, context: ContextTypes.DEFAULT_TY
             health_loose = horde_health_loose,
         ))
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp        = datetime.now(),
-                horde_hero_id    = horde_hero.id,
-                alliance_hero_id = alliance_hero.id,
-                horde_health     = horde_hero_health,
-                alliance_victory = alliance_victory
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.HEALTH,
+            horde    = horde_hero_health,
         )
-
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_bi       = horde_bi,
-                horde_color    = horde_color,
-                alliance_bi    = alliance_bi,
-                alliance_color = alliance_color,
-                horde_health   = horde_hero_health
+        if alliance_victory:
+            record_fight_event(
+                app.log_sink, context.chat_data['fight_id'], FightEventKind.VICTORY,
+                alliance = True,
+            )
+            await session.execute(
+                sql_update(Fight)
+                .where(Fight.id == context.chat_data['fight_id'])
+                .values(finished_at = datetime.now(), victory_side = FightSide.ALLIANCE)
             )
+
+        app.scoreboard.publish_later(app.job_queue, UI_ROLL_DELAY,
+            horde_bi       = horde_bi,
+            horde_color    = horde_color,
+            alliance_bi    = alliance_bi,
+            alliance_color = alliance_color,
+            horde_health   = horde_hero_health
         )
 
         await session.commit()
 
         if not alliance_victory:
-            await asyncio.sleep(5)
-            async with app.db_session() as session:
-                await session.execute(
-                    sql_update(FightToUi)
-                    .values(
-                        horde_bi       = 'magic',
-                        horde_color    = 'green',
-                        alliance_bi    = 'shield',
-                        alliance_color = '#2d2d2d',
-                    )
-                )
-                await session.commit()
+            app.scoreboard.publish_later(app.job_queue, UI_ROLL_DELAY + UI_RESULT_DELAY,
+                horde_bi       = 'magic',
+                horde_color    = 'green',
+                alliance_bi    = 'shield',
+                alliance_color = '#2d2d2d',
+            )
 
 
     return responce
@@ -1117,14 +1015,9 @@ async def alliance_defence_handler(update: Update, context: ContextTypes.DEFAULT
         context.chat_data['alliance_dice']    = alliance_dice
         context.chat_data['alliance_defence'] = alliance_defence
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp          = datetime.now(),
-                horde_hero_id      = horde_hero.id,
-                alliance_hero_id   = alliance_hero.id,
-                alliance_dice_roll = alliance_dice,
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.DICE_ROLL,
+            alliance = alliance_dice,
         )
         
         dice_tens = alliance_dice//10
@@ -1135,28 +1028,11 @@ async def alliance_defence_handler(update: Update, context: ContextTypes.DEFAULT
         else:
             roll_bi = f'{dice_ones}-square'
 
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                alliance_bi =    roll_bi,
-                alliance_color = roll_color,
-            )
+        app.scoreboard.publish(
+            alliance_bi =    roll_bi,
+            alliance_color = roll_color,
         )
 
-        await session.commit()
-    
-    await asyncio.sleep(3)
-
-    async with app.db_session() as session:
-        horde_hero = await app.get_hero_by_id(context.chat_data['horde_hero_id'], session)
-        if not horde_hero or not type(horde_hero) == Hero:
-            logger.warning(f"Fight {chat_id=} got unkonwn horde_hero")
-            return await _reply_error(update, context)
-        
-        alliance_hero = await app.get_hero_by_id(context.chat_data['alliance_hero_id'], session)
-        if not alliance_hero or not type(alliance_hero) == Hero:
-            logger.warning(f"Fight {chat_id=} got unkonwn alliance_hero")
-            return await _reply_error(update, context)
         
         horde_dice           = context.chat_data['horde_dice']
         horde_attack         = context.chat_data['horde_attack']
@@ -1241,42 +1117,37 @@ async def alliance_defence_handler(update: Update, context: ContextTypes.DEFAULT
             health_loose = alliance_health_loose,
         ))
 
-        await session.execute(
-            insert(FightLog)
-            .values(
-                timestamp        = datetime.now(),
-                horde_hero_id    = horde_hero.id,
-                alliance_hero_id = alliance_hero.id,
-                alliance_health  = alliance_hero_health,
-                horde_victory    = horde_victory
-            )
+        record_fight_event(
+            app.log_sink, context.chat_data['fight_id'], FightEventKind.HEALTH,
+            alliance = alliance_hero_health,
         )
-
-        await session.execute(
-            sql_update(FightToUi)
-            .values(
-                horde_bi        = horde_bi,
-                horde_color     = horde_color,
-                alliance_bi     = alliance_bi,
-                alliance_color  = alliance_color,
-                alliance_health = alliance_hero_health
+        if horde_victory:
+            record_fight_event(
+                app.log_sink, context.chat_data['fight_id'], FightEventKind.VICTORY,
+                horde    = True,
+            )
+            await session.execute(
+                sql_update(Fight)
+                .where(Fight.id == context.chat_data['fight_id'])
+                .values(finished_at = datetime.now(), victory_side = FightSide.HORDE)
             )
+
+        app.scoreboard.publish_later(app.job_queue, UI_ROLL_DELAY,
+            horde_bi        = horde_bi,
+            horde_color     = horde_color,
+            alliance_bi     = alliance_bi,
+            alliance_color  = alliance_color,
+            alliance_health = alliance_hero_health
         )
 
         await session.commit()
 
         if not horde_victory:
-            await asyncio.sleep(5)
-            async with app.db_session() as session:
-                await session.execute(
-                    sql_update(FightToUi)
-                    .values(
-                        horde_bi       = 'shield',
-                        horde_color    = '#2d2d2d',
-                        alliance_bi    = 'magic',
-                        alliance_color = 'green',
-                    )
-                )
-                await session.commit()
+            app.scoreboard.publish_later(app.job_queue, UI_ROLL_DELAY + UI_RESULT_DELAY,
+                horde_bi       = 'shield',
+                horde_color    = '#2d2d2d',
+                alliance_bi    = 'magic',
+                alliance_color = 'green',
+            )
 
     return responce
\ No newline at end of file
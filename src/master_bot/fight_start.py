@@ -5,7 +5,6 @@ from telegram.ext import ContextTypes, ConversationHandler
 from sqlalchemy import select, update as sql_update
 
 from loguru import logger
-from jinja2 import Template
 
 from utils.application  import GameApplication
 from utils.config_model import MasterBotConfig
@@ -53,7 +52,7 @@ async def start_fight_accepted_handler(update: Update, context: ContextTypes.DEF
 
         heroes_sel = await session.execute(select(Hero))
         heroes = list(heroes_sel.scalars().all())
-        template_fight_start = Template(app.config.hero.fight_start.text)
+        template_fight_start = app.templates.get(app.config.hero.fight_start.text)
 
         for hero in heroes:
             await app.send_markdown_to_hero(hero, template_fight_start.render(hero=hero))
@@ -3,13 +3,15 @@ from telegram.ext import (
     MessageHandler,
     ConversationHandler
 )
-from telegram.ext.filters import Chat, Text, PHOTO
+from telegram.ext.filters import Chat, PHOTO
 
 from loguru import logger
 
 from utils.application import GameApplication
 from utils.application_builder import GameApplicationBuilder
+from utils.resources import GameResources
 from utils.error_handler import error_handler
+from utils.text_router import TextRouter
 from utils.config_model import StaffBotConfig
 
 from staff_bot.interaction import (
@@ -23,9 +25,8 @@ from staff_bot.interaction import (
     dice_handler,
 )
 
-if __name__ == "__main__":
-    logger.info("Starting now...")
-    app: GameApplication = GameApplicationBuilder().name('staff').build()
+def create_app(resources: GameResources|None = None) -> GameApplication:
+    app: GameApplication = GameApplicationBuilder().resources(resources).name('staff').build()
     bot_config: StaffBotConfig = app.bot_config
     chat_id = bot_config.chat_id
 
@@ -36,32 +37,36 @@ if __name__ == "__main__":
     app.add_handlers([
         ConversationHandler(
             entry_points = [
-                MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['hero_qr']), qr_start_handler)
+                TextRouter(Chat(chat_id)).on(app.config.buttons_fun_to_i18n['hero_qr'], qr_start_handler)
             ],
             states = {
                 QR_AWAIT: [
                     MessageHandler(Chat(chat_id) & PHOTO, qr_image_handler)
                 ],
                 ABILITY_AWAIT: [
-                    MessageHandler(
-                        Chat(chat_id) & Text([
+                    TextRouter(Chat(chat_id)).on([
                             app.config.buttons_fun_to_i18n[key] for key in ['constitution', 'strength', 'dexterity', 'wisdom']
-                        ]),
-                        ability_handler
-                    )
+                        ], ability_handler)
                 ],
                 DICE_AWAIT: [
-                    MessageHandler(Chat(chat_id) & Text(app.dice_keys), dice_handler)
+                    TextRouter(Chat(chat_id)).on(app.dice_keys, dice_handler)
                 ]
             },
             fallbacks = [
                 help_handler,
-                MessageHandler(Chat(chat_id) & Text(app.config.buttons_fun_to_i18n['cancel']), cancel_handler)
-            ]
+                TextRouter(Chat(chat_id)).on(app.config.buttons_fun_to_i18n['cancel'], cancel_handler)
+            ],
+            name = 'staff',
+            persistent = True
         ),
         help_handler
     ])
 
+    return app
+
+if __name__ == "__main__":
+    logger.info("Starting now...")
+    app = create_app()
     logger.info("Starting bot in polling mode...")
     app.run_polling()
     logger.info("Done! Have a great day!")
\ No newline at end of file
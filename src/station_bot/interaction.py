@@ -1,4 +1,7 @@
-from telegram import Update
+import asyncio
+
+from telegram import Update, Message
+from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, ConversationHandler
 
 from loguru import logger
@@ -6,7 +9,6 @@ from loguru import logger
 from utils.application  import GameApplication
 from utils.config_model import StationBotConfig
 from utils.db_model import Station
-from utils.qr_converter import qr_convert
 
 QR_AWAIT= 1
 
@@ -97,22 +99,89 @@ async def qr_image_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         
         await update.message.reply_markdown(app.config.i18n.qr_processing)
         
-        uuid = await qr_convert(update.message.photo[-1])
+        qr = await app.qr_decoder.decode_photos(update.message.photo)
 
-        if not uuid:
-            logger.warning("Station {chat_id=} got unkonwn uuid")
+        if not qr.codes:
+            logger.warning(f"Station {chat_id=} got unkonwn uuid")
             return await _reply_error(update, context, station)
         
-        hero = await app.gain_hero_xp_by_uuid_and_return_hero(uuid, station.xp, {'station_id': station.id}, session)
-        if not hero:
-            logger.warning("Station {chat_id=} got unkonwn hero")
+        if len(qr.codes) > 1:
+            heroes, messages = await app.gain_heroes_xp_by_uuids_and_return_heroes(list(qr.codes), station.xp, {'station_id': station.id}, session)
+            logger.info(f"Station {chat_id=} awarded {len(heroes)} heroes from {len(qr.codes)} codes in one photo")
+        else:
+            hero, messages = await app.gain_hero_xp_by_uuid_and_return_hero(qr.data, station.xp, {'station_id': station.id}, session)
+            heroes = [hero] if hero else []
+
+        if not heroes:
+            logger.warning(f"Station {chat_id=} got unkonwn hero")
             return await _reply_error(update, context, station)
             
         await update.message.reply_markdown(
-            bot_config.success.text.format(station=station, hero=hero),
+            "\n\n".join(bot_config.success.text.format(station=station, hero=hero) for hero in heroes),
             reply_markup=app.construct_reply_keyboard_markup(bot_config.success.buttons)
         )
 
         await session.commit()
 
+    await app.send_pending_messages(messages)
+
     return ConversationHandler.END
+
+async def qr_album_photo_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    Фото из альбома с QR кодами, альбом обрабатывается целиком в `qr_album_handler`
+    """
+    app: GameApplication = context.application
+    chat_id = update.message.chat_id
+
+    if not app.albums.is_open(update.message):
+        logger.info(f"Got album {update.message.media_group_id=} start from {chat_id=}")
+        await update.message.reply_markdown(app.config.i18n.qr_processing)
+    app.albums.add(update.message)
+    return ConversationHandler.END
+
+async def qr_album_continue_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int|None:
+    """
+    Следующие фото альбома приходят после выхода из диалога, принимаются только для уже начатого альбома
+    """
+    app: GameApplication = context.application
+    if not app.albums.is_open(update.message):
+        return None
+    app.albums.add(update.message)
+    return ConversationHandler.END
+
+async def qr_album_handler(context: ContextTypes.DEFAULT_TYPE, chat_id: int, messages: list[Message]) -> None:
+    app: GameApplication = context.application
+    bot_config: StationBotConfig = app.bot_config
+
+    results = await asyncio.gather(*(app.qr_decoder.decode_photos(message.photo) for message in messages))
+    uuids = list(dict.fromkeys(code for result in results for code in result.codes))
+
+    async with app.db_session() as session:
+        station: Station|None = await app.get_by_chat_id(Station, chat_id, session)
+
+        if not station:
+            logger.warning(f"Station {chat_id=} was not found")
+            return
+
+        heroes, pending = await app.gain_heroes_xp_by_uuids_and_return_heroes(uuids, station.xp, {'station_id': station.id}, session) if uuids else ([], [])
+        logger.info(f"Station {chat_id=} awarded {len(heroes)} heroes from {len(uuids)} codes in album of {len(messages)} photos")
+
+        if not heroes:
+            logger.warning(f"Station {chat_id=} got no known heroes in album")
+            await context.bot.send_message(chat_id, app.config.error_message, parse_mode=ParseMode.MARKDOWN)
+            await context.bot.send_message(
+                chat_id, bot_config.help.text.format(station=station), parse_mode=ParseMode.MARKDOWN,
+                reply_markup=app.construct_reply_keyboard_markup(bot_config.help.buttons)
+            )
+            return
+
+        await context.bot.send_message(
+            chat_id, "\n\n".join(bot_config.success.text.format(station=station, hero=hero) for hero in heroes),
+            parse_mode=ParseMode.MARKDOWN,
+            reply_markup=app.construct_reply_keyboard_markup(bot_config.success.buttons)
+        )
+
+        await session.commit()
+
+    await app.send_pending_messages(pending)
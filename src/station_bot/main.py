@@ -3,13 +3,16 @@ from telegram.ext import (
     MessageHandler,
     ConversationHandler
 )
-from telegram.ext.filters import ChatType, Text, PHOTO
+from telegram.ext.filters import ChatType, PHOTO
 
 from loguru import logger
 
 from utils.application import GameApplication
 from utils.application_builder import GameApplicationBuilder
+from utils.resources import GameResources
 from utils.error_handler import error_handler
+from utils.text_router import TextRouter
+from utils.album import AlbumCollector, MEDIA_GROUP
 
 from station_bot.interaction import (
     QR_AWAIT,
@@ -17,34 +20,46 @@ from station_bot.interaction import (
     cancel_handler,
     qr_start_handler,
     qr_image_handler,
+    qr_album_photo_handler,
+    qr_album_continue_handler,
+    qr_album_handler,
 )
 
-if __name__ == "__main__":
-    logger.info("Starting now...")
-    app: GameApplication = GameApplicationBuilder().name('station').build()
+def create_app(resources: GameResources|None = None) -> GameApplication:
+    app: GameApplication = GameApplicationBuilder().resources(resources).name('station').build()
 
     app.add_error_handler(error_handler)
+    app.albums = AlbumCollector(app.job_queue, qr_album_handler)
 
     help_handler = CommandHandler(app.HELP_COMMAND, help_command_handler, filters=ChatType.GROUPS)
 
     app.add_handlers([
         ConversationHandler(
             entry_points = [
-                MessageHandler(ChatType.GROUPS & Text(app.config.buttons_fun_to_i18n['hero_qr']), qr_start_handler)
+                TextRouter(ChatType.GROUPS).on(app.config.buttons_fun_to_i18n['hero_qr'], qr_start_handler),
+                MessageHandler(ChatType.GROUPS & PHOTO & MEDIA_GROUP, qr_album_continue_handler)
             ],
             states = {
                 QR_AWAIT: [
+                    MessageHandler(ChatType.GROUPS & PHOTO & MEDIA_GROUP, qr_album_photo_handler),
                     MessageHandler(ChatType.GROUPS & PHOTO, qr_image_handler)
                 ]
             },
             fallbacks = [
                 help_handler,
-                MessageHandler(ChatType.GROUPS & Text(app.config.buttons_fun_to_i18n['cancel']), cancel_handler)
-            ]
+                TextRouter(ChatType.GROUPS).on(app.config.buttons_fun_to_i18n['cancel'], cancel_handler)
+            ],
+            name = 'station',
+            persistent = True
         ),
         help_handler
     ])
 
+    return app
+
+if __name__ == "__main__":
+    logger.info("Starting now...")
+    app = create_app()
     logger.info("Starting bot in polling mode...")
     app.run_polling()
     logger.info("Done! Have a great day!")
\ No newline at end of file
@@ -0,0 +1,53 @@
+from typing import Any, Callable, Coroutine
+
+from telegram import Message
+from telegram.ext import CallbackContext, JobQueue
+from telegram.ext.filters import MessageFilter
+
+from loguru import logger
+
+AlbumCallback = Callable[[CallbackContext, int, list[Message]], Coroutine[Any, Any, None]]
+
+class _MediaGroup(MessageFilter):
+    __slots__ = ()
+
+    def filter(self, message: Message) -> bool:
+        return message.media_group_id is not None
+
+MEDIA_GROUP = _MediaGroup(name='MEDIA_GROUP')
+
+class AlbumCollector:
+    """
+    Сборка альбома (media group) из отдельных обновлений
+
+    * Telegram присылает каждое фото альбома отдельным обновлением без признака последнего фото,
+      поэтому альбом считается полным, если новых фото нет `ALBUM_WAIT` секунд
+
+    * Обработчик фото только добавляет его в альбом и сразу возвращается, сам альбом обрабатывается в задаче `JobQueue`
+    """
+
+    ALBUM_WAIT = 1.0
+
+    def __init__(self, job_queue: JobQueue, callback: AlbumCallback) -> None:
+        self._job_queue = job_queue
+        self._callback  = callback
+        self._albums: dict[tuple[int, str], list[Message]] = {}
+
+    def is_open(self, message: Message) -> bool:
+        return (message.chat_id, message.media_group_id) in self._albums
+
+    def add(self, message: Message) -> None:
+        key  = (message.chat_id, message.media_group_id)
+        name = f"album:{key[0]}:{key[1]}"
+        self._albums.setdefault(key, []).append(message)
+        for job in self._job_queue.get_jobs_by_name(name):
+            job.schedule_removal()
+        self._job_queue.run_once(self._complete, self.ALBUM_WAIT, data=key, name=name, chat_id=key[0])
+
+    async def _complete(self, context: CallbackContext) -> None:
+        chat_id, media_group_id = context.job.data
+        messages = self._albums.pop((chat_id, media_group_id), [])
+        if not messages:
+            return
+        logger.info(f"Got album {media_group_id=} of {len(messages)} photos from {chat_id=}")
+        await self._callback(context, chat_id, sorted(messages, key=lambda message: message.message_id))
@@ -2,22 +2,39 @@ from telegram.ext import ApplicationBuilder
 
 from utils.application import GameApplication
 from utils.config_model import create_config, BotConfig
+from utils.resources import GameResources
+from utils.persistence import PostgresPersistence
+from utils.rate_limiter import GameRateLimiter
+from utils.update_processor import ChatKeyedUpdateProcessor
 
 class GameApplicationBuilder(ApplicationBuilder):
     def __init__(self):
         super().__init__()
         self._application_class = GameApplication
+        self._resources: GameResources|None = None
+    
+    def resources(self, resources: GameResources|None):
+        """
+        Использовать общие ресурсы вместо создания собственных, нужно вызывать до `name`
+        """
+        self._resources = resources
+        return self
     
     def name(self, name: str):
-        self._name   = name
-        self._config = create_config()
+        self._name = name
+        if not self._resources:
+            self._resources = GameResources(create_config(name))
+        self._config = self._resources.config
 
         self._bot_config: BotConfig = getattr(self._config, self._name)
         
         self._token = self._bot_config.token
+        self.rate_limiter(GameRateLimiter())
+        self.concurrent_updates(ChatKeyedUpdateProcessor(self._bot_config.max_concurrent_updates, self._resources.update_slots))
+        self.persistence(PostgresPersistence(self._name, self._resources.db_session))
         self._application_kwargs = {
             'name':       self._name,
-            'config':     self._config,
+            'resources':  self._resources,
             'bot_config': self._bot_config
         }
-        return self
\ No newline at end of file
+        return self
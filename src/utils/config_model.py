@@ -1,5 +1,10 @@
+import json
 import os
+import stat
 import yaml
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterator
 from dotenv import load_dotenv, find_dotenv
 from pydantic import (
     BaseModel,
@@ -15,6 +20,8 @@ class BotConfig(BaseModel):
     token:   str
     my_name: str
 
+    max_concurrent_updates: int = 32
+
 class TextAndReplyKeyboard(BaseModel):
     text:    str
     buttons: list[str]
@@ -179,6 +186,8 @@ class FightConfig(BaseModel):
     alliance_chat_id: int
     horde_chat_id:    int
 
+    ui_db_fallback: bool = True
+
     introduction: str
 
     inspiration: str
@@ -202,6 +211,12 @@ class FightConfig(BaseModel):
     defeat:  str
     victory: str
 
+class WebhookConfig(BaseModel):
+    url:          str
+    secret_token: str
+
+    max_connections: int = 40
+
 class I18n(BaseModel):
     help:   str
     cancel: str
@@ -212,6 +227,9 @@ class ConfigYaml(BaseSettings):
 
     pg_user:     str
     pg_password: str
+
+    db_pool_size:    int = 10
+    db_max_overflow: int = 2
     
     minio_root_user:     str
     minio_root_password: str
@@ -219,6 +237,20 @@ class ConfigYaml(BaseSettings):
     minio_host:   str
     minio_bucket: str
 
+    minio_cache_dir:        str
+    minio_cache_memory_mb:  int   = 64
+    minio_cache_disk_mb:    int   = 512
+    minio_cache_revalidate: float = 300
+
+    log_spool_dir: str
+
+    http_host: str = '0.0.0.0'
+    http_port: int = 8080
+
+    webhook: WebhookConfig|None = None
+
+    qr_workers: int = 2
+
     error_message: str
 
     master:  MasterBotConfig
@@ -236,9 +268,16 @@ class ConfigYaml(BaseSettings):
 
     i18n: I18n
     
-def create_config() -> ConfigYaml:
+CONFIG_ENV_EXTRA = ('GAME_HOME', 'GAME_DATA', 'MINIO_CERTDIR')
+CONFIG_SECRETS   = {'token', 'pg_password', 'minio_root_password', 'secret_token'}
+
+def create_config(bot_name: str|None = None) -> ConfigYaml:
     """
     Создание конфига из файла и переменных окружения
+
+    Разобранный конфиг сохраняется в снимок, который используется, пока не изменятся файл конфига,
+    переменные окружения или модель конфига. В лог выводится только секция бота `bot_name` без секретов.
+    Снимки хранятся в кэше пользователя процесса, см. `_snapshot_dir`
     """
 
     load_dotenv(find_dotenv())
@@ -247,8 +286,25 @@ def create_config() -> ConfigYaml:
     if not GAME_HOME:
         GAME_HOME = os.getcwd()
 
-    with open(f"{GAME_HOME}/config/config.yaml", "r") as stream:
-        full_config = yaml.safe_load(stream)
+    GAME_DATA = os.getenv('GAME_DATA', GAME_HOME)
+
+    config_raw    = Path(f"{GAME_HOME}/config/config.yaml").read_bytes()
+    snapshot_path = _snapshot_dir() / f"{_config_hash(config_raw)}.json"
+
+    config_obj = _load_snapshot(snapshot_path)
+    if config_obj:
+        logger.info(f"Config is loaded from snapshot {snapshot_path.name}")
+    else:
+        config_obj = _parse_config(config_raw, GAME_DATA)
+        _save_snapshot(snapshot_path, config_obj)
+
+    logged = getattr(config_obj, bot_name) if bot_name else config_obj
+    logger.info(f"\n{logged.model_dump_json(indent=4, exclude=_secrets(logged))}")
+
+    return config_obj
+
+def _parse_config(config_raw: bytes, GAME_DATA: str) -> ConfigYaml:
+    full_config = yaml.load(config_raw, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
 
     if not full_config:
         full_config = {}
@@ -257,13 +313,120 @@ def create_config() -> ConfigYaml:
     if os.getenv('MINIO_CERTDIR'):
         full_config['minio_secure'] = True
 
+    full_config['log_spool_dir']   = f"{GAME_DATA}/log-spool"
+    full_config['minio_cache_dir'] = f"{GAME_DATA}/minio-cache"
+
     buttons_fun_to_i18n: dict[str, str] = full_config['buttons_fun_to_i18n']
     full_config['buttons_i18n_to_fun'] = {
         val: key for key,val in buttons_fun_to_i18n.items()
     }
 
-    config_obj = ConfigYaml(**full_config)
-    
-    logger.info(f"\n{config_obj.model_dump_json(indent=4)}")
+    return ConfigYaml(**full_config)
 
-    return config_obj
+def _config_hash(config_raw: bytes) -> str:
+    """
+    Хэш всего, от чего зависит результат `_parse_config`: файла конфига, переменных окружения и модели конфига
+    """
+    digest = sha256(config_raw)
+    digest.update(Path(__file__).read_bytes())
+    for key, value in sorted(os.environ.items()):
+        if key.upper() in CONFIG_ENV_EXTRA or key.lower().split('__')[0] in ConfigYaml.model_fields:
+            digest.update(f"\0{key}={value}".encode())
+    return digest.hexdigest()
+
+def _snapshot_dir() -> Path:
+    """
+    Каталог снимков в домашнем каталоге пользователя: каждый бот запускается своим пользователем,
+    общий каталог позволил бы одному боту подменить конфиг другим
+    """
+    cache_home = os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'game' / 'config-cache'
+
+def _load_snapshot(snapshot_path: Path) -> ConfigYaml|None:
+    """
+    Загрузка снимка с проверкой прав, секреты берутся из переменных окружения
+    """
+    try:
+        with open(snapshot_path, 'rb') as stream:
+            snapshot_stat = os.fstat(stream.fileno())
+            if snapshot_stat.st_uid != os.getuid() or snapshot_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+                logger.warning(f"Ignoring config snapshot {snapshot_path} not owned by this user or writable by others")
+                return None
+            snapshot = json.load(stream)
+        config_data = snapshot['config']
+        for secret_path in snapshot['secrets']:
+            value = _env_secret(secret_path)
+            if value is None:
+                return None
+            *parents, key = secret_path
+            section = config_data
+            for parent in parents:
+                section = section[parent]
+            section[key] = value
+        return ConfigYaml.model_validate(config_data)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to load config snapshot {snapshot_path}: {e!r}")
+        return None
+
+def _save_snapshot(snapshot_path: Path, config_obj: ConfigYaml) -> None:
+    """
+    Атомарная запись снимка, старые снимки удаляются
+
+    Секреты в снимок не пишутся, сохраняются только пути к ним. Если секрет задан не переменной окружения,
+    а в файле конфига, снимок не сохраняется
+    """
+    secrets = _secrets(config_obj)
+    secret_paths = list(_secret_paths(secrets))
+    if any(_env_secret(secret_path) != _model_value(config_obj, secret_path) for secret_path in secret_paths):
+        logger.info("Config snapshot is not saved: some secrets are not set in environment")
+        return
+
+    snapshot = {
+        'config':  config_obj.model_dump(mode='json', exclude=secrets),
+        'secrets': secret_paths,
+    }
+    try:
+        snapshot_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as stream:
+            json.dump(snapshot, stream, ensure_ascii=False)
+        os.replace(tmp_path, snapshot_path)
+        for old_path in snapshot_path.parent.glob('*.json'):
+            if old_path != snapshot_path:
+                old_path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Failed to save config snapshot {snapshot_path}: {e!r}")
+
+def _model_value(model: BaseModel, path: list[str]) -> object:
+    for key in path:
+        model = getattr(model, key)
+    return model
+
+def _secret_paths(exclude: dict, prefix: tuple[str, ...] = ()) -> Iterator[list[str]]:
+    for key, nested in exclude.items():
+        if nested is True:
+            yield [*prefix, key]
+        else:
+            yield from _secret_paths(nested, (*prefix, key))
+
+def _env_secret(secret_path: list[str]) -> str|None:
+    """
+    Значение секрета из переменной окружения с разделителем `__`, как в `ConfigYaml`
+    """
+    env_name = '__'.join(secret_path).lower()
+    return next((value for key, value in os.environ.items() if key.lower() == env_name), None)
+
+def _secrets(model: BaseModel) -> dict:
+    """
+    Секретные поля модели и вложенных моделей для `exclude` при выводе в лог
+    """
+    exclude = {}
+    for key in type(model).model_fields:
+        value = getattr(model, key)
+        if key in CONFIG_SECRETS:
+            exclude[key] = True
+        elif isinstance(value, BaseModel) and (nested := _secrets(value)):
+            exclude[key] = nested
+    return exclude
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 class StateEnum(Enum):
     FAIR  = 'Ярмарка'
@@ -6,4 +6,18 @@ class StateEnum(Enum):
 
 class Fractions(Enum):
     ALLIANCE = '🛡️ Альянс'
-    HORDE    = '🧌 Орда'
\ No newline at end of file
+    HORDE    = '🧌 Орда'
+
+class FightSide(IntEnum):
+    HORDE    = 1
+    ALLIANCE = 2
+
+class FightEventKind(IntEnum):
+    HEALTH             = 1
+    INSPIRATION        = 2
+    KNOW_VULNERABILITY = 3
+    USE_VULNERABILITY  = 4
+    OWN_VULNERABILITY  = 5
+    DEF_VULNERABILITY  = 6
+    DICE_ROLL          = 7
+    VICTORY            = 8
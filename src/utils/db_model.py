@@ -1,7 +1,9 @@
 from sqlalchemy import (
     Column,
     ForeignKey,
+    Index,
     Integer,
+    SmallInteger,
     BigInteger
 )
 from sqlalchemy.orm import (
@@ -59,7 +61,7 @@ class Hero(Base):
 
     vulnerability: Mapped[str] = mapped_column(nullable=False, default=None)
 
-    uuid:             Mapped[str] = mapped_column(nullable=False, default=None)
+    uuid:             Mapped[str] = mapped_column(nullable=False, default=None, index=True, unique=True)
     qr_image:         Mapped[str] = mapped_column(nullable=False, default=None)
     qr_image_file_id: Mapped[str] = mapped_column(nullable=True,  default=None)
 
@@ -82,11 +84,14 @@ class Hero(Base):
 
 class KnownVulnerability(Base):
     __tablename__ = "known_vulnerabilities"
+    __table_args__ = (
+        Index('ix_known_vulnerabilities_wise_target', 'wise_hero_id', 'target_hero_id'),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(nullable=False, default=None)
     
     wise_hero_id:   Column[int] = Column(Integer, ForeignKey(Hero.id), nullable=False)
-    target_hero_id: Column[int] = Column(Integer, ForeignKey(Hero.id), nullable=False)
+    target_hero_id: Column[int] = Column(Integer, ForeignKey(Hero.id), nullable=False, index=True)
     target = relationship('Hero', lazy='selectin', foreign_keys=target_hero_id)
 
 class Station(Base):
@@ -100,7 +105,7 @@ class Station(Base):
 class Monster(Base):
     __tablename__ = "monsters"
     id:          Mapped[int] = mapped_column(primary_key=True, nullable=False)
-    uuid:        Mapped[str] = mapped_column(nullable=False, default=None)
+    uuid:        Mapped[str] = mapped_column(nullable=False, default=None, index=True, unique=True)
     
     name:        Mapped[str] = mapped_column(nullable=False, default=None)
     description: Mapped[str] = mapped_column(nullable=False, default=None)
@@ -125,7 +130,7 @@ class HeroXpGainLog(Base):
     __tablename__ = "hero_xp_gain_logs"
     id:          Mapped[int]      = mapped_column(primary_key=True, nullable=False)
     timestamp:   Mapped[datetime] = mapped_column(nullable=False, default=None)
-    hero_id:     Mapped[int]      = mapped_column(nullable=False, default=None)
+    hero_id:     Mapped[int]      = mapped_column(nullable=False, default=None, index=True)
     station_id:  Mapped[int]      = mapped_column(nullable=True,  default=None)
     monster_id:  Mapped[int]      = mapped_column(nullable=True,  default=None)
     xp_gained:   Mapped[int]      = mapped_column(nullable=False, default=None)
@@ -153,19 +158,20 @@ class HeroDoorLog(Base):
     __tablename__ = "hero_door_logs"
     id:           Mapped[int]      = mapped_column(primary_key=True, nullable=False)
     timestamp:    Mapped[datetime] = mapped_column(nullable=False, default=None)
-    hero_id:      Mapped[int]      = mapped_column(nullable=False, default=None)
+    hero_id:      Mapped[int]      = mapped_column(nullable=False, default=None, index=True)
     is_question:  Mapped[bool]     = mapped_column(nullable=True, default=None)
     is_staff:     Mapped[bool]     = mapped_column(nullable=True, default=None)
     monster_id:   Mapped[int]      = mapped_column(nullable=True, default=None)
     ability:      Mapped[str]      = mapped_column(nullable=True, default=None)
     hero_victory: Mapped[bool]     = mapped_column(nullable=True, default=None)
 
+# Журнал боёв прежнего формата, новые бои записываются в Fight и FightEvent
 class FightLog(Base):
     __tablename__ = "fight_logs"
     id:               Mapped[int]      = mapped_column(primary_key=True, nullable=False)
     timestamp:        Mapped[datetime] = mapped_column(nullable=False, default=None)
-    horde_hero_id:    Mapped[int]      = mapped_column(nullable=False, default=None)
-    alliance_hero_id: Mapped[int]      = mapped_column(nullable=False, default=None)
+    horde_hero_id:    Mapped[int]      = mapped_column(nullable=False, default=None, index=True)
+    alliance_hero_id: Mapped[int]      = mapped_column(nullable=False, default=None, index=True)
 
     horde_health:    Mapped[int] = mapped_column(nullable=True, default=None)
     alliance_health: Mapped[int] = mapped_column(nullable=True, default=None)
@@ -191,6 +197,25 @@ class FightLog(Base):
     horde_victory:    Mapped[bool] = mapped_column(nullable=True, default=None)
     alliance_victory: Mapped[bool] = mapped_column(nullable=True, default=None)
 
+class Fight(Base):
+    __tablename__ = "fights"
+    id:               Mapped[int]      = mapped_column(primary_key=True, nullable=False)
+    started_at:       Mapped[datetime] = mapped_column(nullable=False, default=None)
+    horde_hero_id:    Mapped[int]      = mapped_column(nullable=False, default=None, index=True)
+    alliance_hero_id: Mapped[int]      = mapped_column(nullable=False, default=None, index=True)
+
+    finished_at:  Mapped[datetime] = mapped_column(nullable=True, default=None)
+    victory_side: Mapped[int]      = mapped_column(nullable=True, default=None, type_=SmallInteger)
+
+class FightEvent(Base):
+    __tablename__ = "fight_events"
+    id:        Mapped[int]      = mapped_column(primary_key=True, nullable=False, type_=BigInteger)
+    fight_id:  Mapped[int]      = mapped_column(nullable=False, default=None, index=True)
+    timestamp: Mapped[datetime] = mapped_column(nullable=False, default=None)
+    kind:      Mapped[int]      = mapped_column(nullable=False, default=None, type_=SmallInteger)
+    side:      Mapped[int]      = mapped_column(nullable=False, default=None, type_=SmallInteger)
+    value:     Mapped[int]      = mapped_column(nullable=False, default=None, type_=SmallInteger)
+
 class FightToUi(Base):
     __tablename__ = "fight_to_ui_table"
     id: Mapped[int] = mapped_column(primary_key=True, nullable=False)
@@ -213,4 +238,11 @@ class FightToUi(Base):
     alliance_dexterity:    Mapped[int] = mapped_column(nullable=True, default=None)
     alliance_wisdom:       Mapped[int] = mapped_column(nullable=True, default=None)
     alliance_bi:           Mapped[str] = mapped_column(nullable=True, default=None)
-    alliance_color:        Mapped[str] = mapped_column(nullable=True, default=None)
\ No newline at end of file
+    alliance_color:        Mapped[str] = mapped_column(nullable=True, default=None)
+
+class BotPersistence(Base):
+    __tablename__ = "bot_persistence"
+    bot_name: Mapped[str]   = mapped_column(primary_key=True, nullable=False)
+    kind:     Mapped[str]   = mapped_column(primary_key=True, nullable=False)
+    key:      Mapped[str]   = mapped_column(primary_key=True, nullable=False)
+    data:     Mapped[bytes] = mapped_column(nullable=False, default=None)
@@ -0,0 +1,80 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from utils.custom_types import FightSide, FightEventKind
+from utils.db_model import Fight, FightEvent
+from utils.log_sink import LogSink
+
+def record_fight_event(
+        sink: LogSink,
+        fight_id: int,
+        kind: FightEventKind,
+        horde: int|bool|None = None,
+        alliance: int|bool|None = None
+    ) -> None:
+    """
+    Запись события боя для каждой стороны, для которой передано значение
+    """
+    timestamp = datetime.now()
+    for side, value in ((FightSide.HORDE, horde), (FightSide.ALLIANCE, alliance)):
+        if value is None:
+            continue
+        sink.write(
+            FightEvent,
+            fight_id  = fight_id,
+            timestamp = timestamp,
+            kind      = int(kind),
+            side      = int(side),
+            value     = int(value),
+        )
+
+@dataclass(slots=True)
+class FightStep:
+    """
+    Шаг боя: значения обеих сторон для одного события
+    """
+    timestamp: datetime
+    kind:      FightEventKind
+    horde:     int|None = None
+    alliance:  int|None = None
+
+@dataclass(slots=True)
+class FightTimeline:
+    """
+    Восстановленный ход боя
+    """
+    fight: Fight
+    steps: list[FightStep] = field(default_factory=list)
+
+    @property
+    def victory_side(self) -> FightSide|None:
+        return FightSide(self.fight.victory_side) if self.fight.victory_side else None
+
+async def read_fight_timeline(fight_id: int, session: AsyncSession) -> FightTimeline|None:
+    """
+    Ход боя по его событиям, события одного шага объединяются
+    """
+    fight = await session.get(Fight, fight_id)
+    if not fight:
+        return None
+
+    events_sel = await session.execute(
+        select(FightEvent.timestamp, FightEvent.kind, FightEvent.side, FightEvent.value)
+        .where(FightEvent.fight_id == fight_id)
+        .order_by(FightEvent.id)
+    )
+
+    timeline = FightTimeline(fight)
+    for timestamp, kind, side, value in events_sel.all():
+        last = timeline.steps[-1] if timeline.steps else None
+        if not last or last.timestamp != timestamp or last.kind != kind:
+            last = FightStep(timestamp, FightEventKind(kind))
+            timeline.steps.append(last)
+        if side == FightSide.HORDE:
+            last.horde = value
+        else:
+            last.alliance = value
+    return timeline
@@ -0,0 +1,255 @@
+import asyncio
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable
+
+import asyncpg
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, ORMExecuteState
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm.session import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from loguru import logger
+
+from utils.db_model import Hero, Test
+
+# Канал триггера на таблице героев, триггер создаётся миграциями в `utils/migrations.py`
+HEROES_CHANNEL = 'heroes_changed'
+
+_SESSION_WROTE   = 'hero_cache_session_wrote'
+_SESSION_SERVED  = 'hero_cache_session_served'
+_SESSION_TOUCHED = 'hero_cache_session_touched'
+
+_caches: 'weakref.WeakSet[HeroCache]' = weakref.WeakSet()
+
+@event.listens_for(Session, 'before_flush')
+def _verify_flush(session: Session, *_: Any) -> None:
+    _verify_served(session)
+
+@event.listens_for(Session, 'after_flush')
+def _mark_flush(session: Session, _: Any) -> None:
+    session.info[_SESSION_WROTE] = True
+    _touch(session)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_dml(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        session = orm_execute_state.session
+        _verify_served(session)
+        session.info[_SESSION_WROTE] = True
+        _touch(session)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_touched(session: Session) -> None:
+    # Оповещение о собственном изменении приходит позже коммита, поэтому свои изменения удаляются из кэша сразу
+    for id in session.info.get(_SESSION_TOUCHED, ()):
+        for cache in _caches:
+            cache.invalidate(id)
+    _clear_marks(session)
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_marks(session: Session) -> None:
+    session.info.pop(_SESSION_WROTE, None)
+    session.info.pop(_SESSION_SERVED, None)
+    session.info.pop(_SESSION_TOUCHED, None)
+
+def _touch(session: Session) -> None:
+    """
+    Запоминание героев сессии, которые могла изменить запись, для удаления из кэша после коммита
+    """
+    session.info.setdefault(_SESSION_TOUCHED, set()).update(
+        key[1][0] for key in session.identity_map.keys() if key[0] is Hero
+    )
+
+def _verify_served(session: Session) -> None:
+    """
+    Проверка героев, выданных сессии из кэша, перед первой записью в транзакции
+
+    Строки героев блокируются (`FOR UPDATE`) и сравниваются со значениями из кэша, так что запись,
+    рассчитанная по устаревшему герою, не перезапишет более новое значение в БД.
+    При расхождении герои удаляются из кэша и поднимается `StaleDataError`
+    """
+    served: dict[int, dict[str, Any]]|None = session.info.pop(_SESSION_SERVED, None)
+    if not served:
+        return
+    column_attrs = inspect(Hero).column_attrs
+    rows_sel = session.connection().execute(
+        select(*[attr.columns[0].label(attr.key) for attr in column_attrs])
+        .where(Hero.__table__.c.id.in_(list(served)))
+        .with_for_update()
+    )
+    rows = {row['id']: dict(row) for row in rows_sel.mappings()}
+    stale = [id for id, values in served.items() if rows.get(id) != values]
+    if stale:
+        for id in stale:
+            for cache in _caches:
+                cache.invalidate(id)
+        raise StaleDataError(f"Cached heroes {stale} were changed by another transaction")
+
+class HeroCache:
+    """
+    Кэш героев в памяти процесса с вытеснением давно не используемых
+
+    * Хранит значения колонок героя, поиск по id, uuid и chat_id
+
+    * Согласованность между процессами поддерживается триггером на таблице героев:
+      каждое изменение приходит через LISTEN и удаляет героя из кэша
+
+    * Пока подписка не установлена, кэш не используется. После переподключения кэш очищается,
+      так как оповещения за время разрыва потеряны
+
+    * Сессия, уже изменявшая данные в текущей транзакции, читает героев напрямую из БД
+
+    * Перед первой записью в транзакции герои, выданные сессии из кэша, сверяются с БД под блокировкой строк,
+      см. `_verify_served`. После коммита изменённые сессией герои сразу удаляются из кэша этого процесса
+
+    Связь `level` у героя из кэша не загружена, `curr_test` загружается отдельным запросом при наличии
+    """
+
+    RECONNECT_DELAY    = 5
+    KEEPALIVE_INTERVAL = 30
+
+    def __init__(self, dsn: str, max_size: int = 1024) -> None:
+        self._dsn      = dsn
+        self._max_size = max_size
+        self._columns  = [attr.key for attr in inspect(Hero).column_attrs]
+
+        self._by_id:      OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self._by_uuid:    dict[str, int] = {}
+        self._by_chat_id: dict[int, int] = {}
+
+        self._generation = 0
+        self._connected  = False
+        self._listener: asyncio.Task|None = None
+        self._change_listeners: list[Callable[[int|None, str|None], None]] = []
+        _caches.add(self)
+
+    def add_change_listener(self, callback: Callable[[int|None, str|None], None]) -> None:
+        """
+        Подписка на изменения героев: id героя и операция (`INSERT`, `UPDATE`, `DELETE`),
+        None - возможно изменились любые герои
+        """
+        self._change_listeners.append(callback)
+
+    def _notify_change(self, id: int|None, op: str|None) -> None:
+        for callback in self._change_listeners:
+            callback(id, op)
+
+    async def start(self) -> None:
+        if not self._listener:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self.clear()
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._by_id.clear()
+        self._by_uuid.clear()
+        self._by_chat_id.clear()
+
+    def invalidate(self, id: int) -> None:
+        self._generation += 1
+        self._drop(id)
+
+    def _drop(self, id: int) -> None:
+        values = self._by_id.pop(id, None)
+        if values:
+            self._by_uuid.pop(values['uuid'], None)
+            self._by_chat_id.pop(values['chat_id'], None)
+
+    async def get_by_id(self, id: int, session: AsyncSession) -> Hero|None:
+        return await self._get(id, Hero.id == id, session)
+
+    async def get_by_uuid(self, uuid: str, session: AsyncSession) -> Hero|None:
+        return await self._get(self._by_uuid.get(uuid), Hero.uuid == uuid, session)
+
+    async def get_by_chat_id(self, chat_id: int, session: AsyncSession) -> Hero|None:
+        return await self._get(self._by_chat_id.get(chat_id), Hero.chat_id == chat_id, session)
+
+    async def _get(self, id: int|None, where: Any, session: AsyncSession) -> Hero|None:
+        usable = self._connected and not session.info.get(_SESSION_WROTE)
+
+        if usable and id is not None:
+            hero = session.identity_map.get(identity_key(Hero, id))
+            if hero is not None:
+                return hero
+            values = self._by_id.get(id)
+            if values:
+                self._by_id.move_to_end(id)
+                return await self._attach(values, session)
+
+        generation = self._generation
+        hero_sel = await session.execute(select(Hero).where(where))
+        hero = hero_sel.scalar_one_or_none()
+        if hero and usable and generation == self._generation and not session.info.get(_SESSION_WROTE):
+            self._put(hero)
+        return hero
+
+    def _put(self, hero: Hero) -> None:
+        values = {key: getattr(hero, key) for key in self._columns}
+        self._drop(hero.id)
+        self._by_id[hero.id] = values
+        self._by_uuid[values['uuid']] = hero.id
+        self._by_chat_id[values['chat_id']] = hero.id
+        while len(self._by_id) > self._max_size:
+            self._drop(next(iter(self._by_id)))
+
+    async def _attach(self, values: dict[str, Any], session: AsyncSession) -> Hero:
+        hero: Hero = inspect(Hero).class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(hero, key, value)
+
+        curr_test = await session.get(Test, hero.curr_test_id) if hero.curr_test_id is not None else None
+        set_committed_value(hero, 'curr_test', curr_test)
+
+        make_transient_to_detached(hero)
+        session.add(hero)
+        session.info.setdefault(_SESSION_SERVED, {})[hero.id] = values
+        return hero
+
+    def _on_notify(self, _: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        op, _, id_str = payload.rpartition(':')
+        id = int(id_str)
+        self.invalidate(id)
+        self._notify_change(id, op or None)
+
+    async def _listen(self) -> None:
+        while True:
+            conn: asyncpg.Connection|None = None
+            try:
+                conn = await asyncpg.connect(self._dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(HEROES_CHANNEL, self._on_notify)
+
+                self.clear()
+                self._notify_change(None, None)
+                self._connected = True
+                logger.info(f"Hero cache is listening on {HEROES_CHANNEL=}")
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), self.KEEPALIVE_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await conn.execute('SELECT 1')
+                logger.warning("Hero cache listener connection was closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Hero cache listener failed: {e!r}")
+            finally:
+                self._connected = False
+                self.clear()
+                if conn and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.RECONNECT_DELAY)
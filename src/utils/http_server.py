@@ -0,0 +1,54 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from fastapi import APIRouter, FastAPI
+
+from loguru import logger
+
+class _EmbeddedServer(uvicorn.Server):
+    """
+    Сервер uvicorn без собственных обработчиков сигналов, остановкой управляет приложение
+    """
+
+    def install_signal_handlers(self) -> None:
+        pass
+
+    @contextmanager
+    def capture_signals(self) -> Iterator[None]:
+        yield
+
+class HttpServer:
+    """
+    HTTP сервер внутри процесса ботов
+
+    Запускается, только если в него добавлен хотя бы один роутер
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.api = FastAPI()
+        self._host = host
+        self._port = port
+        self._has_routes = False
+        self._server: _EmbeddedServer|None = None
+        self._task:   asyncio.Task|None = None
+
+    def include_router(self, router: APIRouter) -> None:
+        self.api.include_router(router)
+        self._has_routes = True
+
+    async def start(self) -> None:
+        if not self._has_routes or self._task:
+            return
+        self._server = _EmbeddedServer(uvicorn.Config(self.api, host=self._host, port=self._port, log_level='warning'))
+        self._task = asyncio.create_task(self._server.serve())
+        logger.info(f"HTTP server is listening on {self._host}:{self._port}")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._server.should_exit = True
+        await self._task
+        self._server = None
+        self._task   = None
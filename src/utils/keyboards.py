@@ -0,0 +1,76 @@
+from typing import Any, Iterable, Iterator
+
+from telegram import (
+    ReplyKeyboardMarkup,
+    InlineKeyboardMarkup,
+    InlineKeyboardButton,
+    ReplyKeyboardRemove,
+)
+from pydantic import BaseModel
+
+from loguru import logger
+
+from utils.config_model import ConfigYaml, TextAndReplyKeyboard, TextAndInlineKeyboard, DiceResult
+
+class KeyboardCache:
+    """
+    Готовые клавиатуры по кортежу функциональных ключей кнопок
+
+    * Клавиатуры для всех списков кнопок конфига строятся при запуске, остальные - при первом запросе
+
+    * Объекты клавиатур в `python-telegram-bot` неизменяемы, поэтому один экземпляр отправляется во все чаты
+    """
+
+    def __init__(self, config: ConfigYaml) -> None:
+        self._buttons_i18n = config.buttons_fun_to_i18n
+        self._reply:  dict[tuple[str, ...], ReplyKeyboardMarkup|ReplyKeyboardRemove] = {}
+        self._inline: dict[tuple[str, ...], InlineKeyboardMarkup|None] = {}
+
+        for model in _keyboard_models(config):
+            if isinstance(model, TextAndInlineKeyboard):
+                self.inline(model.inline_buttons)
+            else:
+                self.reply(model.buttons)
+        logger.info(f"Built {len(self._reply)} reply and {len(self._inline)} inline keyboards")
+
+    def reply(self, buttons: Iterable[str]) -> ReplyKeyboardMarkup|ReplyKeyboardRemove:
+        key = tuple(buttons)
+        markup = self._reply.get(key)
+        if not markup:
+            markup = self._reply[key] = self._build_reply(key)
+        return markup
+
+    def inline(self, buttons: Iterable[str]) -> InlineKeyboardMarkup|None:
+        key = tuple(buttons)
+        if key not in self._inline:
+            self._inline[key] = self._build_inline(key)
+        return self._inline[key]
+
+    def _build_reply(self, buttons: tuple[str, ...]) -> ReplyKeyboardMarkup|ReplyKeyboardRemove:
+        buttons_len = len(buttons)
+        if buttons_len == 0:
+            return ReplyKeyboardRemove()
+        return ReplyKeyboardMarkup(
+            [
+                [ self._buttons_i18n[func_key] for func_key in buttons[idx:idx+2] ]
+                for idx in range(0,buttons_len,2)
+            ] if buttons_len > 2 \
+                else [
+                    [ self._buttons_i18n[func_key] ] for func_key in buttons
+                ]
+        )
+
+    def _build_inline(self, buttons: tuple[str, ...]) -> InlineKeyboardMarkup|None:
+        if not buttons:
+            return None
+        return InlineKeyboardMarkup([
+            [ InlineKeyboardButton(text=self._buttons_i18n[func_key], callback_data=func_key) ]
+            for func_key in buttons
+        ])
+
+def _keyboard_models(value: Any) -> Iterator[TextAndReplyKeyboard|TextAndInlineKeyboard|DiceResult]:
+    if isinstance(value, (TextAndReplyKeyboard, TextAndInlineKeyboard, DiceResult)):
+        yield value
+    elif isinstance(value, BaseModel):
+        for key in type(value).model_fields:
+            yield from _keyboard_models(getattr(value, key))
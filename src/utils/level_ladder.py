@@ -0,0 +1,81 @@
+import asyncio
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+
+from sqlalchemy import select
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from loguru import logger
+
+from utils.db_model import Level
+
+@dataclass(frozen=True, slots=True)
+class XpOutcome:
+    """
+    Результат начисления опыта: итоговый уровень, остаток опыта и полученные уровни
+    """
+    level_id:       int
+    xp:             int
+    points_gained:  int
+    levels_reached: tuple[int, ...]
+
+class LevelLadder:
+    """
+    Таблица уровней в памяти
+
+    Уровни не меняются во время игры, поэтому загружаются один раз и обновляются по запросу
+    """
+
+    def __init__(self) -> None:
+        self._ids        = array('q')
+        self._xp_to_gain = array('q')
+        self._cumulative = array('q', [0])
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """
+        Загрузка уровней из БД
+        """
+        levels_sel = await session.execute(
+            select(Level.id, Level.xp_to_gain).order_by(Level.id)
+        )
+        levels = levels_sel.all()
+        self._ids        = array('q', (level.id for level in levels))
+        self._xp_to_gain = array('q', (level.xp_to_gain for level in levels))
+        self._cumulative = array('q', accumulate(self._xp_to_gain, initial=0))
+        logger.info(f"Loaded {len(self._ids)} levels")
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self._ids:
+            return
+        async with self._lock:
+            if not self._ids:
+                await self.refresh(session)
+
+    def next_level(self, level_id: int) -> Level:
+        """
+        Следующий уровень после заданного
+        """
+        idx = bisect_right(self._ids, level_id)
+        if idx == len(self._ids):
+            raise NoResultFound(f"No level after {level_id=}")
+        return Level(id=self._ids[idx], xp_to_gain=self._xp_to_gain[idx])
+
+    def apply_xp(self, level_id: int, xp: int, xp_gained: int) -> XpOutcome:
+        """
+        Начисление опыта без обращения к БД
+
+        Опыт тратится на уровни по порядку, пока его хватает, остаток сохраняется
+        """
+        start  = bisect_right(self._ids, level_id)
+        budget = self._cumulative[start] + xp + xp_gained
+        end    = max(bisect_right(self._cumulative, budget) - 1, start)
+        return XpOutcome(
+            level_id       = self._ids[end - 1] if end > start else level_id,
+            xp             = budget - self._cumulative[end],
+            points_gained  = end - start,
+            levels_reached = tuple(self._ids[start:end]),
+        )
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import DateTime, Table
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from loguru import logger
+
+from utils.db_model import Base
+
+class LogSink:
+    """
+    Буферизованная запись журналов событий в БД
+
+    * Обработчики только добавляют запись в буфер, запись в БД идёт в фоне через COPY
+      каждые `flush_interval` секунд или по накоплении `max_batch` записей
+
+    * Если БД недоступна или процесс останавливается без доступа к БД, записи сохраняются
+      в файл в `spool_dir` и дописываются в БД при следующей успешной записи.
+      Если сохранить файл не удалось, записи возвращаются в буфер
+
+    * Нечитаемый файл или файл, который БД не принимает `MAX_REPLAY_ATTEMPTS` раз подряд, переносится
+      в `spool_dir/quarantine` и больше не дописывается, его можно вернуть в `spool_dir` вручную
+
+    Журнал попадает в БД независимо от транзакции обработчика
+    """
+
+    MAX_REPLAY_ATTEMPTS = 5
+
+    def __init__(self, engine: AsyncEngine, spool_dir: Path, flush_interval: float = 0.2, max_batch: int = 500) -> None:
+        self._engine         = engine
+        self._spool_dir      = spool_dir
+        self._quarantine_dir = spool_dir / 'quarantine'
+        self._flush_interval = flush_interval
+        self._max_batch      = max_batch
+
+        self._buffers: dict[str, list[tuple]] = {}
+        self._size     = 0
+        self._wakeup   = asyncio.Event()
+        self._lock     = asyncio.Lock()
+        self._closing  = False
+        self._spooled  = True
+        self._flusher: asyncio.Task|None = None
+        self._replay_failures: dict[str, int] = {}
+
+    def write(self, model: type[Base], **values: Any) -> None:
+        """
+        Добавление записи журнала, недостающие колонки заполняются NULL
+        """
+        table: Table = model.__table__
+        self._buffers.setdefault(table.name, []).append(
+            tuple(values.get(column.key) for column in self._columns(table))
+        )
+        self._size += 1
+        if self._size >= self._max_batch:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if not self._flusher:
+            self._closing = False
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Фоновая запись не отменяется, чтобы не потерять уже взятую из буфера пачку
+        if self._flusher:
+            self._closing = True
+            self._wakeup.set()
+            await self._flusher
+            self._flusher = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            buffers, self._buffers, self._size = self._buffers, {}, 0
+            self._wakeup.clear()
+            if not buffers:
+                return
+            try:
+                await self._copy(buffers)
+            except Exception as e:
+                logger.error(f"Failed to write {sum(map(len, buffers.values()))} log records, spooling: {e!r}")
+                try:
+                    self._spool(buffers)
+                except OSError as e:
+                    logger.error(f"Failed to spool log records to {self._spool_dir}, keeping them in memory: {e!r}")
+                    self._restore(buffers)
+                return
+            if self._spooled:
+                await self._replay_spool()
+
+    async def _run(self) -> None:
+        try:
+            async with self._lock:
+                await self._replay_spool()
+        except Exception as e:
+            logger.error(f"Failed to replay log spool: {e!r}")
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Log sink flush failed: {e!r}")
+
+    def _restore(self, buffers: dict[str, list[tuple]]) -> None:
+        """
+        Возврат невыполненной пачки в начало буфера
+        """
+        for table_name, records in buffers.items():
+            self._buffers[table_name] = records + self._buffers.get(table_name, [])
+            self._size += len(records)
+
+    async def _copy(self, buffers: dict[str, list[tuple]]) -> None:
+        async with self._engine.connect() as conn:
+            raw_conn = await conn.get_raw_connection()
+            driver_conn = raw_conn.driver_connection
+            async with driver_conn.transaction():
+                for table_name, records in buffers.items():
+                    await driver_conn.copy_records_to_table(
+                        table_name,
+                        records=records,
+                        columns=[column.key for column in self._columns(Base.metadata.tables[table_name])]
+                    )
+
+    @staticmethod
+    def _columns(table: Table) -> list:
+        return [column for column in table.columns if not column.primary_key]
+
+    def _spool(self, buffers: dict[str, list[tuple]]) -> None:
+        self._spooled = True
+        self._spool_dir.mkdir(parents=True, exist_ok=True)
+        path = self._spool_dir / f"{datetime.now():%Y%m%d%H%M%S%f}-{os.getpid()}.jsonl"
+        # Файл пишется под временным именем, чтобы недописанный файл не попал в БД вместе с записями, вернувшимися в буфер
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                for table_name, records in buffers.items():
+                    for record in records:
+                        file.write(json.dumps({'table': table_name, 'record': record}, default=datetime.isoformat) + '\n')
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    async def _replay_spool(self) -> None:
+        self._spooled = False
+        if not self._spool_dir.is_dir():
+            return
+        for path in sorted(self._spool_dir.glob('*.jsonl')):
+            # Файл забирается переименованием, чтобы другие процессы не записали его повторно
+            claimed = path.with_suffix(f".{os.getpid()}.replay")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue
+
+            try:
+                buffers = self._read_spool(claimed)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"Log spool {path.name} is unreadable: {e!r}")
+                self._quarantine(claimed, path)
+                continue
+            try:
+                await self._copy(buffers)
+            except Exception as e:
+                failures = self._replay_failures[path.name] = self._replay_failures.get(path.name, 0) + 1
+                logger.warning(f"Failed to replay log spool {path.name}, attempt {failures}: {e!r}")
+                if failures >= self.MAX_REPLAY_ATTEMPTS:
+                    self._quarantine(claimed, path)
+                    continue
+                claimed.rename(path)
+                self._spooled = True
+                return
+            self._replay_failures.pop(path.name, None)
+            claimed.unlink()
+            logger.info(f"Replayed log spool {path.name}")
+
+    def _read_spool(self, path: Path) -> dict[str, list[tuple]]:
+        buffers: dict[str, list[tuple]] = {}
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                entry = json.loads(line)
+                columns = self._columns(Base.metadata.tables[entry['table']])
+                buffers.setdefault(entry['table'], []).append(tuple(
+                    datetime.fromisoformat(value) if value is not None and isinstance(column.type, DateTime) else value
+                    for column, value in zip(columns, entry['record'])
+                ))
+        return buffers
+
+    def _quarantine(self, claimed: Path, path: Path) -> None:
+        self._replay_failures.pop(path.name, None)
+        try:
+            self._quarantine_dir.mkdir(parents=True, exist_ok=True)
+            claimed.rename(self._quarantine_dir / path.name)
+        except OSError as e:
+            logger.error(f"Failed to quarantine log spool {path.name}: {e!r}")
+            return
+        logger.error(f"Log spool {path.name} is moved to {self._quarantine_dir}")
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from loguru import logger
+
+from utils.db_model import Base
+
+MIGRATIONS_LOCK_KEY = 0x6761_6d65
+
+@dataclass(frozen=True, slots=True)
+class OnlineIndex:
+    """
+    Индекс, создаваемый без блокировки записи в таблицу (`CREATE INDEX CONCURRENTLY`)
+    """
+    name:    str
+    table:   str
+    columns: tuple[str, ...]
+    unique:  bool = False
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """
+    Версия схемы БД
+
+    Сначала в одной транзакции выполняются `statements`, затем по одному создаются `indexes`.
+    Операции должны быть идемпотентны: прерванная миграция выполняется заново целиком.
+    SQL миграции не меняется после выпуска и не берётся из кода приложения, изменения вносятся новой миграцией
+    """
+    version:     int
+    description: str
+    statements:  tuple[str, ...] = ()
+    indexes:     tuple[OnlineIndex, ...] = ()
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        1, "unique uuid indexes",
+        indexes = (
+            OnlineIndex('ix_heroes_uuid',   'heroes',   ('uuid', ), unique=True),
+            OnlineIndex('ix_monsters_uuid', 'monsters', ('uuid', ), unique=True),
+        )
+    ),
+    Migration(
+        2, "heroes change notifications",
+        statements = (
+            """
+            CREATE OR REPLACE FUNCTION notify_heroes_changed() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('heroes_changed', COALESCE(NEW.id, OLD.id)::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS heroes_changed ON heroes",
+            """
+            CREATE TRIGGER heroes_changed
+            AFTER INSERT OR UPDATE OR DELETE ON heroes
+            FOR EACH ROW EXECUTE FUNCTION notify_heroes_changed()
+            """,
+        )
+    ),
+    Migration(
+        3, "known vulnerabilities lookup indexes",
+        indexes = (
+            OnlineIndex('ix_known_vulnerabilities_wise_target',    'known_vulnerabilities', ('wise_hero_id', 'target_hero_id')),
+            OnlineIndex('ix_known_vulnerabilities_target_hero_id', 'known_vulnerabilities', ('target_hero_id', )),
+        )
+    ),
+    Migration(
+        4, "log tables hero indexes",
+        indexes = (
+            OnlineIndex('ix_hero_xp_gain_logs_hero_id',    'hero_xp_gain_logs', ('hero_id', )),
+            OnlineIndex('ix_hero_door_logs_hero_id',       'hero_door_logs',    ('hero_id', )),
+            OnlineIndex('ix_fight_logs_horde_hero_id',     'fight_logs',        ('horde_hero_id', )),
+            OnlineIndex('ix_fight_logs_alliance_hero_id',  'fight_logs',        ('alliance_hero_id', )),
+        )
+    ),
+    Migration(
+        5, "heroes change notifications with operation",
+        statements = (
+            """
+            CREATE OR REPLACE FUNCTION notify_heroes_changed() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('heroes_changed', TG_OP || ':' || COALESCE(NEW.id, OLD.id)::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+        )
+    ),
+)
+
+async def run_migrations(engine: AsyncEngine, migrations: tuple[Migration, ...] = MIGRATIONS) -> None:
+    """
+    Создание недостающих таблиц и применение новых миграций
+
+    Одновременный запуск из нескольких процессов исключается advisory lock
+    """
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {'key': MIGRATIONS_LOCK_KEY})
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.execute(text(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        version     integer   PRIMARY KEY,
+                        description text      NOT NULL,
+                        applied_at  timestamp NOT NULL DEFAULT now()
+                    )
+                    """
+                ))
+                applied_sel = await conn.execute(text("SELECT version FROM schema_migrations"))
+                applied = set(applied_sel.scalars())
+
+            for migration in sorted(migrations, key=lambda migration: migration.version):
+                if migration.version in applied:
+                    continue
+                logger.info(f"Applying migration {migration.version=} {migration.description=}")
+                await _apply(engine, lock_conn, migration)
+                logger.success(f"Applied migration {migration.version=}")
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': MIGRATIONS_LOCK_KEY})
+
+async def _apply(engine: AsyncEngine, autocommit_conn: AsyncConnection, migration: Migration) -> None:
+    if migration.statements:
+        async with engine.begin() as conn:
+            for statement in migration.statements:
+                await conn.execute(text(statement))
+
+    for index in migration.indexes:
+        await _create_index_concurrently(autocommit_conn, index)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+            {'version': migration.version, 'description': migration.description}
+        )
+
+async def _create_index_concurrently(conn: AsyncConnection, index: OnlineIndex) -> None:
+    # Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс, IF NOT EXISTS его не пересоздаст
+    valid_sel = await conn.execute(
+        text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"),
+        {'name': index.name}
+    )
+    valid = valid_sel.scalar_one_or_none()
+    if valid is False:
+        logger.warning(f"Dropping invalid index {index.name=}")
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+
+    unique = "UNIQUE " if index.unique else ""
+    columns = ", ".join(index.columns)
+    await conn.execute(text(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON {index.table} ({columns})"))
@@ -1,4 +1,5 @@
 import asyncio
+import time
 from io import BytesIO
 from minio import Minio, S3Error
 from loguru import logger
@@ -6,12 +7,14 @@ import filetype
 
 from PIL import Image
 
+from utils.object_cache import ObjectCache, CachedObject
+
 class MinIOClient:
     """
     Обёртка для удобного асинхронного взаимодействия с MINIO
     """
 
-    def __init__(self, access_key: str, secret_key: str, secure: bool, host: str) -> None:
+    def __init__(self, access_key: str, secret_key: str, secure: bool, host: str, cache: ObjectCache|None = None) -> None:
         self.host = host
         self.base_url = f"{'https' if secure else 'http'}://{self.host}"
         self._client = Minio(self.host,
@@ -20,6 +23,7 @@ class MinIOClient:
             secure=secure
         )
         self._semaphore = asyncio.Semaphore(50)
+        self._cache = cache
 
     async def _put_object(self, bucket: str, filename: str, bio: BytesIO, content_type: str) -> None:
         """
@@ -43,6 +47,9 @@ class MinIOClient:
         async with self._semaphore:
             logger.info(f"Uploading {filename} to MinIO into bukcket {bucket}")
             await self._put_object(bucket, filename, bio, content_type)
+        if self._cache:
+            self._cache.drop_memory(bucket, filename)
+            await asyncio.get_event_loop().run_in_executor(None, self._cache.drop_disk, bucket, filename)
         logger.success(f"Done uploading {filename} to MinIO into bukcket {bucket}")
     
     async def upload_with_thumbnail_and_return_filename(self, bucket: str, filename_wo_extension: str, bio: BytesIO) -> str:
@@ -85,29 +92,87 @@ class MinIOClient:
     async def download(self, bucket: str, filename: str) -> tuple[BytesIO | None, str]:
         """
         Асинхронная загрузка файла из бакета
+
+        При наличии кэша файл берётся из памяти или с диска, устаревшая копия сверяется с MinIO по ETag
+        """
+        if not self._cache:
+            file_bytes, content_type, _ = await self._get_object(bucket, filename)
+            return file_bytes, content_type
+
+        loop = asyncio.get_event_loop()
+        cached = self._cache.get_memory(bucket, filename)
+        if not cached:
+            cached = await loop.run_in_executor(None, self._cache.get_disk, bucket, filename)
+            if cached:
+                self._cache.put_memory(bucket, filename, cached)
+
+        if cached and time.time() - cached.checked_at > self._cache.revalidate_after:
+            cached = await self._revalidate(bucket, filename, cached)
+
+        if cached:
+            logger.info(f"File {filename} from MinIO {bucket} is taken from cache")
+            return BytesIO(cached.data), cached.content_type
+
+        file_bytes, content_type, etag = await self._get_object(bucket, filename)
+        if file_bytes:
+            cached = CachedObject(file_bytes.getvalue(), content_type, etag, time.time())
+            self._cache.put_memory(bucket, filename, cached)
+            await loop.run_in_executor(None, self._cache.put_disk, bucket, filename, cached)
+        return file_bytes, content_type
+
+    async def _revalidate(self, bucket: str, filename: str, cached: CachedObject) -> CachedObject|None:
         """
+        Сверка ETag копии в кэше с MinIO, изменённый или удалённый файл вытесняется из кэша
+
+        Если MinIO недоступен, отдаётся копия из кэша, следующая сверка - через `revalidate_after` секунд
+        """
+        def _stat_object():
+            return self._client.stat_object(bucket, filename)
+
+        try:
+            stat = await asyncio.get_event_loop().run_in_executor(None, _stat_object)
+        except S3Error as e:
+            if e.code != 'NoSuchKey':
+                logger.warning(f"Failed to revalidate {filename} in MinIO {bucket}, serving cached copy: {e!r}")
+                cached.checked_at = time.time()
+                return cached
+            stat = None
+        except Exception as e:
+            logger.warning(f"Failed to revalidate {filename} in MinIO {bucket}, serving cached copy: {e!r}")
+            cached.checked_at = time.time()
+            return cached
+
+        if stat and cached.etag and stat.etag == cached.etag:
+            cached.checked_at = time.time()
+            await asyncio.get_event_loop().run_in_executor(None, self._cache.update_disk_meta, bucket, filename, cached)
+            return cached
+
+        logger.info(f"File {filename} in MinIO {bucket} has changed, dropping it from cache")
+        self._cache.drop_memory(bucket, filename)
+        await asyncio.get_event_loop().run_in_executor(None, self._cache.drop_disk, bucket, filename)
+        return None
+
+    async def _get_object(self, bucket: str, filename: str) -> tuple[BytesIO | None, str, str|None]:
         logger.info(f"Downloading {filename} from MinIO bucket {bucket}")
 
         def _get_object():
-            return self._client.get_object(bucket, filename)
+            response = self._client.get_object(bucket, filename)
+            try:
+                return response.read(), response.getheader('content-type'), response.getheader('etag')
+            finally:
+                response.close()
+                response.release_conn()
 
         try:
-            response = await asyncio.get_event_loop().run_in_executor(None, _get_object)
-            logger.success(f"Done downloading {filename} from MinIO {bucket}")
-            file_bytes   = BytesIO(response.read())
-            content_type = response.getheader('content-type')
+            data, content_type, etag = await asyncio.get_event_loop().run_in_executor(None, _get_object)
         except S3Error as e:
             if e.code == 'NoSuchKey':
                 logger.info(f"File {filename} not found in MinIO {bucket}")
-                file_bytes   = None
-                content_type = 'application/octet-stream'
-            else:
-                raise e
-        else:
-            response.close()
-            response.release_conn()
+                return None, 'application/octet-stream', None
+            raise e
 
-        return file_bytes, content_type
+        logger.success(f"Done downloading {filename} from MinIO {bucket}")
+        return BytesIO(data), content_type, (etag or '').strip('"') or None
     
     async def create_bucket(self, bucket: str) -> None:
         """
@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+
+from loguru import logger
+
+@dataclass
+class CachedObject:
+    data:         bytes
+    content_type: str
+    etag:         str|None
+    checked_at:   float
+
+class ObjectCache:
+    """
+    Двухуровневый кэш объектов MinIO
+
+    * Память - LRU, ограниченный суммарным размером объектов
+
+    * Диск - файлы в `disk_dir`, также ограничены суммарным размером. Каталог общий для всех процессов,
+      `disk_bytes` - общий предел каталога: после каждой записи каталог пересчитывается и вытесняются
+      давно не читавшиеся файлы (порядок по времени изменения, чтение его обновляет). Пропавший файл считается промахом
+
+    * Объект старше `revalidate_after` секунд сверяется с MinIO по ETag, см. `MinIOClient.download`
+
+    Методы работы с диском блокирующие, вызываются из пула потоков и защищены блокировкой
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: Path, disk_bytes: int, revalidate_after: float) -> None:
+        self.revalidate_after = revalidate_after
+
+        self._memory_bytes = memory_bytes
+        self._memory_used  = 0
+        self._memory: OrderedDict[tuple[str, str], CachedObject] = OrderedDict()
+
+        self._disk_dir   = disk_dir
+        self._disk_bytes = disk_bytes
+        self._disk_lock = threading.Lock()
+        self._disk_enabled = disk_bytes > 0
+        if self._disk_enabled:
+            self._evict_disk()
+
+    def get_memory(self, bucket: str, filename: str) -> CachedObject|None:
+        cached = self._memory.get((bucket, filename))
+        if cached:
+            self._memory.move_to_end((bucket, filename))
+        return cached
+
+    def put_memory(self, bucket: str, filename: str, cached: CachedObject) -> None:
+        if len(cached.data) > self._memory_bytes:
+            return
+        self.drop_memory(bucket, filename)
+        self._memory[(bucket, filename)] = cached
+        self._memory_used += len(cached.data)
+        while self._memory_used > self._memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted.data)
+
+    def drop_memory(self, bucket: str, filename: str) -> None:
+        cached = self._memory.pop((bucket, filename), None)
+        if cached:
+            self._memory_used -= len(cached.data)
+
+    def get_disk(self, bucket: str, filename: str) -> CachedObject|None:
+        if not self._disk_enabled:
+            return None
+        with self._disk_lock:
+            return self._get_disk(self._key(bucket, filename))
+
+    def _get_disk(self, key: str) -> CachedObject|None:
+        try:
+            meta = json.loads((self._disk_dir / f"{key}.json").read_text())
+            data = (self._disk_dir / f"{key}.bin").read_bytes()
+            if len(data) != meta['size']:
+                return None
+            os.utime(self._disk_dir / f"{key}.bin")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Dropping broken MinIO disk cache entry {key}: {e!r}")
+            self._drop_disk_key(key)
+            return None
+        return CachedObject(data, meta['content_type'], meta['etag'], meta['checked_at'])
+
+    def put_disk(self, bucket: str, filename: str, cached: CachedObject) -> None:
+        if not self._disk_enabled or len(cached.data) > self._disk_bytes:
+            return
+        with self._disk_lock:
+            try:
+                self._disk_dir.mkdir(parents=True, exist_ok=True)
+                key = self._key(bucket, filename)
+                self._write_atomic(self._disk_dir / f"{key}.bin", cached.data)
+                self._write_atomic(self._disk_dir / f"{key}.json", self._meta(bucket, filename, cached))
+            except OSError as e:
+                logger.warning(f"Failed to cache {filename} from MinIO {bucket} on disk, disk cache is disabled: {e!r}")
+                self._disk_enabled = False
+                return
+            self._evict_disk()
+
+    def update_disk_meta(self, bucket: str, filename: str, cached: CachedObject) -> None:
+        """
+        Сохранение времени сверки с MinIO, чтобы после перезапуска объект не сверялся заново
+        """
+        if not self._disk_enabled:
+            return
+        with self._disk_lock:
+            key = self._key(bucket, filename)
+            if not (self._disk_dir / f"{key}.bin").exists():
+                return
+            try:
+                self._write_atomic(self._disk_dir / f"{key}.json", self._meta(bucket, filename, cached))
+            except OSError as e:
+                logger.warning(f"Failed to update MinIO disk cache entry {key}: {e!r}")
+
+    def drop_disk(self, bucket: str, filename: str) -> None:
+        if not self._disk_enabled:
+            return
+        with self._disk_lock:
+            self._drop_disk_key(self._key(bucket, filename))
+
+    def _drop_disk_key(self, key: str) -> None:
+        try:
+            for suffix in ('json', 'bin'):
+                (self._disk_dir / f"{key}.{suffix}").unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to drop MinIO disk cache entry {key}: {e!r}")
+
+    def _evict_disk(self) -> None:
+        """
+        Вытеснение по общему размеру каталога, включая файлы других процессов
+        """
+        entries: list[tuple[float, int, str]] = []
+        try:
+            for path in self._disk_dir.glob('*.bin'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path.stem))
+        except OSError as e:
+            logger.warning(f"Failed to scan MinIO disk cache {self._disk_dir}: {e!r}")
+            return
+        used = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if used <= self._disk_bytes:
+                break
+            self._drop_disk_key(key)
+            used -= size
+
+    @staticmethod
+    def _meta(bucket: str, filename: str, cached: CachedObject) -> bytes:
+        return json.dumps({
+            'bucket': bucket, 'filename': filename, 'size': len(cached.data),
+            'content_type': cached.content_type, 'etag': cached.etag, 'checked_at': cached.checked_at
+        }).encode()
+
+    @staticmethod
+    def _key(bucket: str, filename: str) -> str:
+        return sha256(f"{bucket}/{filename}".encode()).hexdigest()
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,63 @@
+import asyncio
+
+from telegram import Bot
+from telegram.ext import ExtBot
+from telegram.request import HTTPXRequest
+
+from loguru import logger
+
+from utils.config_model import ConfigYaml
+from utils.rate_limiter import GameRateLimiter
+
+class PeerBots:
+    """
+    Реестр долгоживущих клиентов ботов для отправки сообщений в чаты других ботов
+
+    Клиенты создаются один раз и держат открытый пул соединений с Telegram,
+    боты приложений текущего процесса переиспользуются как есть
+    """
+
+    CONNECTION_POOL_SIZE = 32
+
+    def __init__(self, config: ConfigYaml) -> None:
+        self._config = config
+        self._bots:  dict[str, Bot] = {}
+        self._owned: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    def register(self, name: str, bot: Bot) -> None:
+        """
+        Регистрация бота, жизненным циклом которого управляет приложение
+        """
+        self._bots.setdefault(name, bot)
+
+    async def get(self, name: str) -> Bot:
+        """
+        Получение инициализированного клиента бота по имени секции конфига
+        """
+        bot = self._bots.get(name)
+        if bot:
+            return bot
+        async with self._lock:
+            bot = self._bots.get(name)
+            if bot:
+                return bot
+            logger.info(f"Creating peer bot client {name=}")
+            bot = ExtBot(
+                getattr(self._config, name).token,
+                request=HTTPXRequest(connection_pool_size=self.CONNECTION_POOL_SIZE),
+                rate_limiter=GameRateLimiter()
+            )
+            await bot.initialize()
+            self._bots[name] = bot
+            self._owned.add(name)
+            return bot
+
+    async def shutdown(self) -> None:
+        """
+        Закрытие созданных реестром клиентов
+        """
+        for name in self._owned:
+            logger.info(f"Shutting down peer bot client {name=}")
+            await self._bots.pop(name).shutdown()
+        self._owned.clear()
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import pickle
+from collections import defaultdict
+from typing import Any
+
+from telegram.ext import BasePersistence, PersistenceInput
+from telegram.ext._utils.types import CDCData, ConversationDict, ConversationKey
+
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from loguru import logger
+
+from utils.db_model import BotPersistence
+
+CHAT_DATA = 'chat_data'
+CONVERSATION = 'conversation:'
+
+class PostgresPersistence(BasePersistence[dict, dict, dict]):
+    """
+    Хранение `chat_data` и состояний диалогов в таблице `bot_persistence`
+
+    * Изменения копятся в памяти и записываются одним запросом не чаще раза в `flush_delay` секунд
+
+    * Данные хранятся в pickle, ключи диалогов - в JSON
+
+    * Данные пользователей, бота и callback data не хранятся
+    """
+
+    def __init__(self, bot_name: str, db_session: async_sessionmaker, update_interval: float = 1, flush_delay: float = 0.5) -> None:
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=True, user_data=False, callback_data=False),
+            update_interval=update_interval
+        )
+        self._bot_name    = bot_name
+        self._db_session  = db_session
+        self._flush_delay = flush_delay
+
+        self._loaded: dict[str, dict[str, bytes]]|None = None
+        self._pending: dict[tuple[str, str], bytes|None] = {}
+        self._flush_task: asyncio.Task|None = None
+        self._lock = asyncio.Lock()
+
+    async def get_chat_data(self) -> dict[int, dict]:
+        loaded = await self._load()
+        return defaultdict(dict, {
+            int(key): pickle.loads(data) for key, data in loaded.get(CHAT_DATA, {}).items()
+        })
+
+    async def get_conversations(self, name: str) -> ConversationDict:
+        loaded = await self._load()
+        return {
+            tuple(json.loads(key)): pickle.loads(data) for key, data in loaded.get(CONVERSATION + name, {}).items()
+        }
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        self._write(CHAT_DATA, str(chat_id), data)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self._write(CHAT_DATA, str(chat_id), None)
+
+    async def update_conversation(self, name: str, key: ConversationKey, new_state: object|None) -> None:
+        self._write(CONVERSATION + name, json.dumps(key), new_state)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def get_user_data(self) -> dict[int, dict]:
+        return {}
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        pass
+
+    async def drop_user_data(self, user_id: int) -> None:
+        pass
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
+
+    async def get_callback_data(self) -> CDCData|None:
+        return None
+
+    async def update_callback_data(self, data: CDCData) -> None:
+        pass
+
+    async def flush(self) -> None:
+        await self._flush()
+
+    def _write(self, kind: str, key: str, data: Any|None) -> None:
+        self._pending[(kind, key)] = pickle.dumps(data, pickle.HIGHEST_PROTOCOL) if data is not None else None
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_delay)
+            if await self._flush():
+                return
+
+    async def _flush(self) -> bool:
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return True
+
+            upserts = [
+                {'bot_name': self._bot_name, 'kind': kind, 'key': key, 'data': data}
+                for (kind, key), data in pending.items() if data is not None
+            ]
+            deletes = [(kind, key) for (kind, key), data in pending.items() if data is None]
+            try:
+                async with self._db_session() as session:
+                    if upserts:
+                        upsert = pg_insert(BotPersistence).values(upserts)
+                        await session.execute(upsert.on_conflict_do_update(
+                            index_elements=[BotPersistence.bot_name, BotPersistence.kind, BotPersistence.key],
+                            set_={'data': upsert.excluded.data}
+                        ))
+                    for kind, key in deletes:
+                        await session.execute(
+                            delete(BotPersistence).where(
+                                (BotPersistence.bot_name == self._bot_name) &
+                                (BotPersistence.kind     == kind) &
+                                (BotPersistence.key      == key)
+                            )
+                        )
+                    await session.commit()
+            except asyncio.CancelledError:
+                self._pending = pending | self._pending
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to persist {len(pending)} entries of {self._bot_name=}, will retry: {e!r}")
+                self._pending = pending | self._pending
+                return False
+            return True
+
+    async def _load(self) -> dict[str, dict[str, bytes]]:
+        if self._loaded is not None:
+            return self._loaded
+
+        self._loaded = defaultdict(dict)
+        async with self._db_session() as session:
+            conn = await session.connection()
+            # Таблицу создаёт бот master при первом запуске, до этого сохранённых данных нет
+            if not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(BotPersistence.__tablename__)):
+                return self._loaded
+            rows_sel = await session.execute(
+                select(BotPersistence.kind, BotPersistence.key, BotPersistence.data)
+                .where(BotPersistence.bot_name == self._bot_name)
+            )
+            for kind, key, data in rows_sel.all():
+                self._loaded[kind][key] = data
+        return self._loaded
@@ -1,21 +1,193 @@
+import asyncio
 import io
-from pyzbar.pyzbar import decode
-from PIL import Image
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Sequence
+
+from pyzbar.pyzbar import decode, ZBarSymbol
+from PIL import Image, ImageOps
 
 from telegram import PhotoSize
 
 from loguru import logger
 
-async def qr_convert(photo: PhotoSize) -> str|None:
-    try:
-        file = await photo.get_file()
-        in_memory = io.BytesIO()
-        await file.download_to_memory(in_memory)
-        in_memory.seek(0)
-
-        qr_decoded   = decode(Image.open(in_memory))
-        qr_data: str = qr_decoded[0].data.decode("utf-8")
-        return qr_data
-    except Exception as e:
-        logger.error(f"Got an error while processing qr code")
-        return None
\ No newline at end of file
+QR_SMALL_SIDE  = 800
+QR_BINARY_CUT  = 128
+QR_ROTATE_STEP = 45
+
+QR_MAX_BYTES  = 20 * 2**20
+QR_MAX_SIDE   = 4096
+QR_MAX_PIXELS = QR_MAX_SIDE * QR_MAX_SIDE
+
+QR_MIN_SIDE      = 320
+QR_TARGET_RATE   = 0.8
+QR_RATE_WEIGHT   = 0.1
+QR_MIN_ATTEMPTS  = 10
+QR_EXPLORE_EVERY = 20
+
+@dataclass(frozen=True)
+class QrDecodeResult:
+    """
+    Результат распознавания QR кода
+
+    `codes` - все коды в кадре в порядке обнаружения, `stage` - проход каскада, на котором они распознаны, время указано в секундах.
+    `cached` - результат взят из кэша без скачивания и распознавания, `error` - ошибка скачивания или распознавания
+    """
+    codes:         tuple[str, ...]
+    stage:         str|None
+    download_time: float
+    decode_time:   float
+    cached:        bool = False
+    error:         str|None = None
+
+    @property
+    def data(self) -> str|None:
+        return self.codes[0] if self.codes else None
+
+class QrDecoder:
+    """
+    Распознавание QR кодов в пуле процессов, не блокирующее цикл событий ботов
+
+    * Сначала пробуются дешёвые проходы (уменьшенное изображение в оттенках серого),
+      затем полное разрешение, бинаризация и поворот
+
+    * Пул создаётся при первом распознавании и общий для всех ботов процесса.
+      Если процесс пула упал (нехватка памяти, ошибка zbar), пул пересоздаётся при следующем распознавании
+
+    * Изображения больше `QR_MAX_BYTES` не распознаются, больше `QR_MAX_PIXELS` - уменьшаются при чтении JPEG
+      или отклоняются
+
+    * Результаты хранятся по `file_unique_id`, повторно отправленное фото не скачивается и не распознаётся.
+      Ошибки скачивания и распознавания не кэшируются
+
+    * Из вариантов размера фото первым пробуется самый маленький, который обычно распознаётся,
+      при неудаче - следующие по размеру. Доля успешных распознаваний ведётся по размерам,
+      изредка снова пробуются и маленькие размеры с низкой долей
+    """
+
+    def __init__(self, workers: int, cache_size: int = 1024) -> None:
+        self._workers    = workers
+        self._cache_size = cache_size
+        self._pool: ProcessPoolExecutor|None = None
+        self._cache: OrderedDict[str, QrDecodeResult] = OrderedDict()
+        self._size_rates:    dict[int, float] = {}
+        self._size_attempts: dict[int, int]   = {}
+        self._scans = 0
+
+    async def decode_photos(self, photos: Sequence[PhotoSize]) -> QrDecodeResult:
+        """
+        Распознавание по вариантам размера одного фото, начиная с самого маленького подходящего
+        """
+        by_side = sorted(photos, key=_side)
+        candidates = [photo for photo in by_side if _side(photo) >= QR_MIN_SIDE] or by_side[-1:]
+
+        self._scans += 1
+        if self._scans % QR_EXPLORE_EVERY:
+            start = next((idx for idx, photo in enumerate(candidates) if self._is_likely(_side(photo))), len(candidates) - 1)
+            candidates = candidates[start:]
+
+        for photo in candidates:
+            result = await self.decode_photo(photo)
+            if not result.cached and not result.error:
+                self._record(_side(photo), bool(result.codes))
+            if result.codes:
+                return result
+        return result
+
+    def _is_likely(self, side: int) -> bool:
+        return self._size_attempts.get(side, 0) < QR_MIN_ATTEMPTS or self._size_rates[side] >= QR_TARGET_RATE
+
+    def _record(self, side: int, success: bool) -> None:
+        rate = self._size_rates.get(side, float(success))
+        self._size_rates[side]    = rate + (success - rate) * QR_RATE_WEIGHT
+        self._size_attempts[side] = self._size_attempts.get(side, 0) + 1
+
+    async def decode_photo(self, photo: PhotoSize) -> QrDecodeResult:
+        cached = self._cache.get(photo.file_unique_id)
+        if cached:
+            self._cache.move_to_end(photo.file_unique_id)
+            logger.info(f"QR code {photo.file_unique_id=} {cached.stage=} is taken from cache")
+            return QrDecodeResult(cached.codes, cached.stage, 0, 0, cached=True)
+
+        started = time.perf_counter()
+        try:
+            file = await photo.get_file()
+            image = bytes(await file.download_as_bytearray())
+        except Exception as e:
+            logger.error(f"Got an error while downloading qr code {photo.file_unique_id=}: {e!r}")
+            return QrDecodeResult((), None, time.perf_counter() - started, 0, error=repr(e))
+        download_time = time.perf_counter() - started
+
+        result = await self.decode(image, download_time)
+        if not result.error:
+            self._cache[photo.file_unique_id] = result
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        logger.info(
+            f"QR code {photo.file_unique_id=} {photo.width}x{photo.height} {result.stage=} "
+            f"download {result.download_time:.3f}s decode {result.decode_time:.3f}s"
+        )
+        return result
+
+    async def decode(self, image: bytes, download_time: float = 0) -> QrDecodeResult:
+        if len(image) > QR_MAX_BYTES:
+            logger.error(f"QR code image of {len(image)} bytes is too large")
+            return QrDecodeResult((), None, download_time, 0, error=f"image is larger than {QR_MAX_BYTES} bytes")
+        if not self._pool:
+            self._pool = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context('spawn'))
+        pool = self._pool
+        try:
+            codes, stage, decode_time = await asyncio.get_running_loop().run_in_executor(pool, _decode_cascade, image)
+        except BrokenProcessPool as e:
+            logger.error(f"QR code process pool is broken, it will be recreated: {e!r}")
+            if self._pool is pool:
+                self._pool = None
+                await asyncio.to_thread(pool.shutdown, wait=False, cancel_futures=True)
+            return QrDecodeResult((), None, download_time, 0, error=repr(e))
+        except Exception as e:
+            logger.error(f"Got an error while processing qr code: {e!r}")
+            return QrDecodeResult((), None, download_time, 0, error=repr(e))
+        return QrDecodeResult(codes, stage, download_time, decode_time)
+
+    async def stop(self) -> None:
+        if self._pool:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+def _side(photo: PhotoSize) -> int:
+    return max(photo.width, photo.height)
+
+def _decode_cascade(image: bytes) -> tuple[tuple[str, ...], str|None, float]:
+    """
+    Проходы распознавания от дешёвых к дорогим, выполняется в процессе пула
+    """
+    started = time.perf_counter()
+    opened = Image.open(io.BytesIO(image))
+    if opened.width * opened.height > QR_MAX_PIXELS:
+        # JPEG сразу декодируется в уменьшенном размере, остальные форматы с таким размером отклоняются
+        opened.draft('L', (QR_MAX_SIDE // 2, QR_MAX_SIDE // 2))
+        if opened.width * opened.height > QR_MAX_PIXELS:
+            raise ValueError(f"Image {opened.width}x{opened.height} is too large")
+    gray = ImageOps.exif_transpose(opened).convert('L')
+
+    def stages():
+        if max(gray.size) > QR_SMALL_SIDE:
+            small = gray.copy()
+            small.thumbnail((QR_SMALL_SIDE, QR_SMALL_SIDE))
+            yield 'small', small
+        yield 'full', gray
+        binary = ImageOps.autocontrast(gray).point(lambda p: 255 if p > QR_BINARY_CUT else 0)
+        yield 'binary', binary
+        for angle in range(QR_ROTATE_STEP, 90, QR_ROTATE_STEP):
+            yield f"rotate_{angle}", binary.rotate(angle, expand=True, fillcolor=255)
+
+    for stage, candidate in stages():
+        qr_decoded = decode(candidate, symbols=[ZBarSymbol.QRCODE])
+        if qr_decoded:
+            codes = tuple(dict.fromkeys(symbol.data.decode("utf-8") for symbol in qr_decoded))
+            return codes, stage, time.perf_counter() - started
+    return (), None, time.perf_counter() - started
@@ -0,0 +1,67 @@
+import asyncio
+from time import monotonic
+from typing import Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from loguru import logger
+
+from utils.db_model import Hero, Monster
+
+QrKind = Literal['hero', 'monster']
+
+class QrResolver:
+    """
+    Соответствие uuid из QR кодов героям и монстрам в памяти процесса
+
+    * Неизвестные uuid (мусор, чужие QR коды) отсекаются без обращения к БД
+
+    * При промахе соответствие перечитывается, но не чаще раза в `RELOAD_INTERVAL` секунд.
+      Добавление героя (и переподключение к оповещениям) сбрасывает это ограничение, так что новый герой находится сразу.
+      Обновления героев на соответствие не влияют и его не сбрасывают
+    """
+
+    RELOAD_INTERVAL = 30
+
+    def __init__(self) -> None:
+        self._uuids:    dict[str, tuple[QrKind, int]] = {}
+        self._loaded_at = float('-inf')
+        self._stale     = True
+        self._lock      = asyncio.Lock()
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    def on_hero_change(self, id: int|None, op: str|None) -> None:
+        if op is None or op == 'INSERT':
+            self.mark_stale()
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """
+        Загрузка uuid героев и монстров из БД
+        """
+        heroes_sel   = await session.execute(select(Hero.uuid, Hero.id))
+        monsters_sel = await session.execute(select(Monster.uuid, Monster.id))
+        uuids: dict[str, tuple[QrKind, int]] = {uuid: ('monster', id) for uuid, id in monsters_sel.all()}
+        uuids |= {uuid: ('hero', id) for uuid, id in heroes_sel.all()}
+        self._uuids     = uuids
+        self._loaded_at = monotonic()
+        self._stale     = False
+        logger.info(f"Loaded {len(uuids)} QR uuids")
+
+    async def resolve(self, uuid: str, session: AsyncSession) -> tuple[QrKind, int]|None:
+        """
+        Тип и id владельца QR кода или None, если такого uuid нет
+        """
+        found = self._uuids.get(uuid)
+        if found or not self._reload_allowed():
+            return found
+
+        async with self._lock:
+            if self._reload_allowed():
+                await self.refresh(session)
+        return self._uuids.get(uuid)
+
+    def _reload_allowed(self) -> bool:
+        return self._stale or monotonic() - self._loaded_at >= self.RELOAD_INTERVAL
@@ -0,0 +1,131 @@
+import asyncio
+from datetime import timedelta
+from time import monotonic
+from typing import Any, Callable, Coroutine
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from loguru import logger
+
+class TokenBucket:
+    """
+    Корзина токенов: не больше `capacity` запросов подряд и `rate` запросов в секунду в среднем
+
+    Ожидающие получают токены в порядке очереди
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate     = rate
+        self._capacity = capacity
+        self._tokens   = capacity
+        self._updated  = monotonic()
+        self._lock     = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = monotonic()
+                self._tokens  = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+class GameRateLimiter(BaseRateLimiter[int]):
+    """
+    Ограничитель исходящих запросов бота с учётом лимитов Telegram
+
+    * Общий лимит бота и отдельный лимит на каждую группу
+
+    * Запросы в один чат уходят строго по очереди, в разные чаты - параллельно
+
+    * При `RetryAfter` все запросы бота ждут указанное время и запрос повторяется
+    """
+
+    GLOBAL_RATE = 30
+    GROUP_RATE  = 20 / 60
+    GROUP_BURST = 20
+
+    def __init__(self, max_retries: int = 3) -> None:
+        self._max_retries   = max_retries
+        self._global        = TokenBucket(self.GLOBAL_RATE, self.GLOBAL_RATE)
+        self._groups:       dict[int|str, TokenBucket]  = {}
+        self._chat_locks:   dict[int|str, asyncio.Lock] = {}
+        self._chat_waiters: dict[int|str, int]          = {}
+        self._retry_until   = 0.0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def process_request(
+            self,
+            callback: Callable[..., Coroutine[Any, Any, bool|dict[str, Any]|list[dict[str, Any]]]],
+            args: Any,
+            kwargs: dict[str, Any],
+            endpoint: str,
+            data: dict[str, Any],
+            rate_limit_args: int|None,
+        ) -> bool|dict[str, Any]|list[dict[str, Any]]:
+        max_retries = rate_limit_args if rate_limit_args is not None else self._max_retries
+        chat_id = data.get('chat_id')
+        if chat_id is None:
+            return await self._process(callback, args, kwargs, endpoint, None, max_retries)
+
+        # Блокировка чата удаляется, когда её никто не держит и не ждёт, как в `ChatKeyedUpdateProcessor`
+        lock = self._chat_locks.get(chat_id)
+        if not lock:
+            lock = self._chat_locks[chat_id] = asyncio.Lock()
+        self._chat_waiters[chat_id] = self._chat_waiters.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                return await self._process(callback, args, kwargs, endpoint, chat_id, max_retries)
+        finally:
+            self._chat_waiters[chat_id] -= 1
+            if not self._chat_waiters[chat_id]:
+                del self._chat_waiters[chat_id]
+                del self._chat_locks[chat_id]
+
+    async def _process(
+            self,
+            callback: Callable[..., Coroutine[Any, Any, bool|dict[str, Any]|list[dict[str, Any]]]],
+            args: Any,
+            kwargs: dict[str, Any],
+            endpoint: str,
+            chat_id: int|str|None,
+            max_retries: int
+        ) -> bool|dict[str, Any]|list[dict[str, Any]]:
+        group = self._group_bucket(chat_id)
+        attempt = 0
+        while True:
+            flood_wait = self._retry_until - monotonic()
+            if flood_wait > 0:
+                await asyncio.sleep(flood_wait)
+
+            await self._global.acquire()
+            if group:
+                await group.acquire()
+
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt >= max_retries:
+                    raise e
+                attempt += 1
+                retry_after = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else float(e.retry_after)
+                logger.warning(f"Got flood wait on {endpoint=} for {chat_id=}, retrying in {retry_after} seconds ({attempt=})")
+                self._retry_until = max(self._retry_until, monotonic() + retry_after + 0.1)
+
+    def _group_bucket(self, chat_id: int|str|None) -> TokenBucket|None:
+        if chat_id is None:
+            return None
+        if isinstance(chat_id, int) and chat_id > 0:
+            return None
+        bucket = self._groups.get(chat_id)
+        if not bucket:
+            bucket = self._groups[chat_id] = TokenBucket(self.GROUP_RATE, self.GROUP_BURST)
+        return bucket
@@ -0,0 +1,54 @@
+import asyncio
+import signal
+
+from loguru import logger
+
+from utils.application import GameApplication
+
+async def run_applications(apps: list[GameApplication]) -> None:
+    """
+    Запуск нескольких ботов в одном цикле событий
+
+    Повторяет жизненный цикл `Application.run_polling` для каждого приложения, останавливает все по сигналу.
+    Если в конфиге задан `webhook`, обновления приходят через общий HTTP сервер вместо опроса
+    """
+    webhooks = apps[0].webhooks
+    if webhooks:
+        apps[0].http_server.include_router(webhooks.router)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGABRT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    initialized: list[GameApplication] = []
+    started:     list[GameApplication] = []
+    try:
+        for app in apps:
+            logger.info(f"Starting app {app.name=}")
+            await app.initialize()
+            initialized.append(app)
+            if app.post_init:
+                await app.post_init(app)
+            if app.webhooks:
+                await app.webhooks.start(app.name)
+            else:
+                await app.updater.start_polling()
+            await app.start()
+            started.append(app)
+            logger.success(f"App {app.name=} is running in {'webhook' if app.webhooks else 'polling'} mode")
+
+        await stop_event.wait()
+    finally:
+        for app in reversed(started):
+            logger.info(f"Stopping app {app.name=}")
+            if app.updater.running:
+                await app.updater.stop()
+            if app.running:
+                await app.stop()
+            if app.post_stop:
+                await app.post_stop(app)
+        for app in reversed(initialized):
+            await app.shutdown()
+            if app.post_shutdown:
+                await app.post_shutdown(app)
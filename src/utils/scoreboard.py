@@ -0,0 +1,181 @@
+import asyncio
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from telegram.ext import CallbackContext, JobQueue
+from sqlalchemy import inspect, select, update as sql_update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from loguru import logger
+
+from utils.db_model import FightToUi
+
+class Scoreboard:
+    """
+    Табло текущего боя для внешних экранов
+
+    * Обработчики боя публикуют изменения, подключённые экраны получают их сразу через WebSocket или SSE
+
+    * Новый экран сначала получает полное состояние, затем изменения.
+      Отстающий экран вместо пропущенных изменений получает полное состояние заново
+
+    * Анимация строится отложенными изменениями через `JobQueue`, обработчики их не ждут
+
+    * Строка `fight_to_ui_table` обновляется в фоне не чаще раза в `DB_SYNC_INTERVAL` секунд
+      и остаётся для экранов, опрашивающих БД
+    """
+
+    DB_SYNC_INTERVAL = 0.5
+    SUBSCRIBER_QUEUE = 64
+
+    def __init__(self, db_session: async_sessionmaker, db_fallback: bool = True) -> None:
+        self._db_session  = db_session
+        self._db_fallback = db_fallback
+
+        self._fields  = [attr.key for attr in inspect(FightToUi).column_attrs if attr.key != 'id']
+        self._state:   dict[str, Any] = dict.fromkeys(self._fields)
+        self._version = 0
+        self._live:      dict[str, int] = {}
+        self._scheduled: dict[str, int] = {}
+        self._subscribers: set[asyncio.Queue] = set()
+
+        self._db_dirty  = asyncio.Event()
+        self._db_synced = 0
+        self._db_sync: asyncio.Task|None = None
+
+        self.router = self._create_router()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {'type': 'snapshot', 'version': self._version, 'data': dict(self._state)}
+
+    def publish(self, **delta: Any) -> None:
+        """
+        Изменение состояния табло
+        """
+        self._apply(delta)
+        for key in delta:
+            self._live[key] = self._version
+
+    def publish_later(self, job_queue: JobQueue, delay: float, **delta: Any) -> None:
+        """
+        Отложенное изменение табло для анимации
+
+        Не применяется к полям, изменённым через `publish` после планирования,
+        и не перекрывает более поздние отложенные изменения
+        """
+        self._check(delta)
+        job_queue.run_once(self._publish_job, delay, data=(self._version, delta), name='scoreboard')
+
+    async def _publish_job(self, context: CallbackContext) -> None:
+        cursor, delta = context.job.data
+        fresh = {
+            key: value for key, value in delta.items()
+            if self._live.get(key, 0) <= cursor and self._scheduled.get(key, 0) <= cursor
+        }
+        if not fresh:
+            return
+        for key in fresh:
+            self._scheduled[key] = cursor
+        self._apply(fresh)
+
+    def _check(self, delta: dict[str, Any]) -> None:
+        unknown = delta.keys() - self._state.keys()
+        if unknown:
+            raise KeyError(f"Unknown scoreboard fields {unknown=}")
+
+    def _apply(self, delta: dict[str, Any]) -> None:
+        self._check(delta)
+        self._state |= delta
+        self._version += 1
+        message = {'type': 'delta', 'version': self._version, 'data': delta}
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot())
+
+        if self._db_fallback:
+            self._db_dirty.set()
+
+    async def start(self) -> None:
+        async with self._db_session() as session:
+            row = (await session.execute(select(FightToUi))).scalar_one_or_none()
+        if row:
+            self._state = {key: getattr(row, key) for key in self._fields}
+        if self._db_fallback and not self._db_sync:
+            self._db_sync = asyncio.create_task(self._sync_db())
+
+    async def stop(self) -> None:
+        if self._db_sync:
+            self._db_sync.cancel()
+            try:
+                await self._db_sync
+            except asyncio.CancelledError:
+                pass
+            self._db_sync = None
+            try:
+                await self._write_db()
+            except Exception as e:
+                logger.warning(f"Failed to sync scoreboard to DB on stop: {e!r}")
+
+    async def _sync_db(self) -> None:
+        while True:
+            await self._db_dirty.wait()
+            self._db_dirty.clear()
+            try:
+                await self._write_db()
+            except Exception as e:
+                logger.warning(f"Failed to sync scoreboard to DB: {e!r}")
+                self._db_dirty.set()
+            await asyncio.sleep(self.DB_SYNC_INTERVAL)
+
+    async def _write_db(self) -> None:
+        if self._db_synced == self._version:
+            return
+        version, state = self._version, dict(self._state)
+        async with self._db_session() as session:
+            await session.execute(sql_update(FightToUi).values(**state))
+            await session.commit()
+        self._db_synced = version
+
+    async def _subscribe(self) -> AsyncIterator[dict[str, Any]]:
+        queue: asyncio.Queue = asyncio.Queue(self.SUBSCRIBER_QUEUE)
+        queue.put_nowait(self.snapshot())
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def _create_router(self) -> APIRouter:
+        router = APIRouter(prefix='/fight')
+
+        @router.get('/snapshot')
+        async def snapshot() -> dict[str, Any]:
+            return self.snapshot()
+
+        @router.get('/events')
+        async def events() -> StreamingResponse:
+            async def stream() -> AsyncIterator[str]:
+                async with aclosing(self._subscribe()) as messages:
+                    async for message in messages:
+                        yield f"event: {message['type']}\ndata: {json.dumps(message['data'], ensure_ascii=False)}\nid: {message['version']}\n\n"
+            return StreamingResponse(stream(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+        @router.websocket('/ws')
+        async def websocket(websocket: WebSocket) -> None:
+            await websocket.accept()
+            async with aclosing(self._subscribe()) as messages:
+                try:
+                    async for message in messages:
+                        await websocket.send_json(message)
+                except WebSocketDisconnect:
+                    pass
+
+        return router
@@ -0,0 +1,61 @@
+from string import Formatter
+from typing import Any, Iterator
+
+from jinja2 import Environment, Template, TemplateSyntaxError
+from pydantic import BaseModel
+
+from loguru import logger
+
+JINJA_MARKERS = ('{{', '{%', '{#')
+
+class TemplateRegistry:
+    """
+    Скомпилированные шаблоны Jinja2 из конфига
+
+    * Все строки конфига с разметкой Jinja2 компилируются один раз при создании реестра,
+      обработчики получают готовый шаблон по исходному тексту
+
+    * Ошибки синтаксиса в шаблонах Jinja2 и строках для `str.format` обнаруживаются при запуске, а не посреди игры
+    """
+
+    def __init__(self, config: BaseModel) -> None:
+        self._env = Environment()
+        self._templates: dict[str, Template] = {}
+
+        errors: list[str] = []
+        for path, source in _strings(config, ''):
+            try:
+                if any(marker in source for marker in JINJA_MARKERS):
+                    self._templates[source] = self._env.from_string(source)
+                elif '{' in source or '}' in source:
+                    list(Formatter().parse(source))
+            except (TemplateSyntaxError, ValueError) as e:
+                errors.append(f"{path}: {e}")
+        if errors:
+            raise ValueError("Invalid templates in config:\n" + "\n".join(errors))
+        logger.info(f"Compiled {len(self._templates)} templates")
+
+    def get(self, source: str) -> Template:
+        """
+        Шаблон по исходному тексту, не найденные в конфиге строки компилируются и запоминаются
+        """
+        template = self._templates.get(source)
+        if not template:
+            template = self._templates[source] = self._env.from_string(source)
+        return template
+
+    def render(self, source: str, **context: Any) -> str:
+        return self.get(source).render(**context)
+
+def _strings(value: Any, path: str) -> Iterator[tuple[str, str]]:
+    if isinstance(value, str):
+        yield path, value
+    elif isinstance(value, BaseModel):
+        for key in type(value).model_fields:
+            yield from _strings(getattr(value, key), f"{path}.{key}" if path else key)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _strings(item, f"{path}.{key}")
+    elif isinstance(value, list):
+        for idx, item in enumerate(value):
+            yield from _strings(item, f"{path}[{idx}]")
@@ -0,0 +1,52 @@
+from typing import Any, Callable, Coroutine, Iterable
+
+from telegram import Update
+from telegram.ext import Application, BaseHandler
+from telegram.ext.filters import BaseFilter
+
+HandlerCallback = Callable[[Update, Any], Coroutine[Any, Any, Any]]
+
+class TextRouter(BaseHandler[Update, Any, Any]):
+    """
+    Обработчик сообщений с текстом кнопок, заменяющий цепочку `MessageHandler(... & Text([...]))`
+
+    * Обработчик выбирается поиском точного текста сообщения в словаре, а не перебором фильтров
+
+    * Фильтр `filters` (например, `Chat(chat_id)`) проверяется один раз до поиска
+
+    * Один текст не может вести к двум обработчикам, конфликт обнаруживается при запуске
+    """
+
+    def __init__(self, filters: BaseFilter|None = None) -> None:
+        super().__init__(self._unrouted)
+        self.filters = filters
+        self.routes: dict[str, HandlerCallback] = {}
+
+    def on(self, texts: str|Iterable[str], callback: HandlerCallback) -> 'TextRouter':
+        """
+        Добавление обработчика для одного или нескольких текстов
+        """
+        for text in [texts] if isinstance(texts, str) else texts:
+            routed = self.routes.setdefault(text, callback)
+            if routed is not callback:
+                raise ValueError(f"Text {text=} is already routed to {routed.__name__}")
+        return self
+
+    def check_update(self, update: object) -> HandlerCallback|None:
+        if not isinstance(update, Update) or not update.effective_message:
+            return None
+        text = update.effective_message.text
+        if text is None:
+            return None
+        callback = self.routes.get(text)
+        if not callback or (self.filters and not self.filters.check_update(update)):
+            return None
+        return callback
+
+    async def handle_update(self, update: Update, application: Application, check_result: HandlerCallback, context: Any) -> Any:
+        self.collect_additional_context(context, update, application, check_result)
+        return await check_result(update, context)
+
+    @staticmethod
+    async def _unrouted(update: Update, context: Any) -> None:
+        raise RuntimeError("TextRouter callbacks are selected in handle_update")
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Awaitable
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+class ChatKeyedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Параллельная обработка обновлений из разных чатов
+
+    Обновления одного чата обрабатываются строго по очереди, чтобы состояние `ConversationHandler` оставалось верным.
+    Очередь чата занимается до общего лимита, поэтому ожидающие своей очереди обновления не занимают места в лимите.
+    `shared_slots` - лимит, общий для всех ботов процесса, см. `GameResources.update_slots`
+    """
+
+    def __init__(self, max_concurrent_updates: int, shared_slots: asyncio.Semaphore|None = None) -> None:
+        super().__init__(max_concurrent_updates)
+        self._shared_slots  = shared_slots
+        self._chat_locks:   dict[int, asyncio.Lock] = {}
+        self._chat_waiters: dict[int, int] = {}
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            return await super().process_update(update, coroutine)
+
+        lock = self._chat_locks.get(chat_id)
+        if not lock:
+            lock = self._chat_locks[chat_id] = asyncio.Lock()
+        self._chat_waiters[chat_id] = self._chat_waiters.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                await super().process_update(update, coroutine)
+        finally:
+            self._chat_waiters[chat_id] -= 1
+            if not self._chat_waiters[chat_id]:
+                del self._chat_waiters[chat_id]
+                del self._chat_locks[chat_id]
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        if not self._shared_slots:
+            return await coroutine
+        async with self._shared_slots:
+            await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @staticmethod
+    def _chat_id(update: object) -> int|None:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
@@ -0,0 +1,71 @@
+import hmac
+from hashlib import sha256
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from telegram import Update
+from telegram.ext import Application
+
+from loguru import logger
+
+from utils.config_model import WebhookConfig
+
+class WebhookGateway:
+    """
+    Приём обновлений Telegram для всех ботов процесса через общий HTTP сервер
+
+    * Каждый бот получает обновления по своему пути `/telegram/<имя бота>`
+
+    * Секретный токен у каждого бота свой и выводится из общего секрета конфига,
+      запросы без верного заголовка `X-Telegram-Bot-Api-Secret-Token` отклоняются
+
+    * Обновление сразу кладётся в `update_queue` приложения, дальше обработка идёт как при опросе
+    """
+
+    PREFIX = '/telegram'
+
+    def __init__(self, config: WebhookConfig) -> None:
+        self._config = config
+        self._apps: dict[str, Application] = {}
+        self.router = self._create_router()
+
+    def add(self, name: str, app: Application) -> None:
+        self._apps[name] = app
+
+    def url(self, name: str) -> str:
+        return f"{self._config.url.rstrip('/')}{self.PREFIX}/{name}"
+
+    def secret_token(self, name: str) -> str:
+        return hmac.new(self._config.secret_token.encode(), name.encode(), sha256).hexdigest()
+
+    async def start(self, name: str) -> None:
+        """
+        Регистрация вебхука бота в Telegram, не доставленные обновления сохраняются
+        """
+        app = self._apps[name]
+        await app.bot.set_webhook(
+            url=self.url(name),
+            secret_token=self.secret_token(name),
+            allowed_updates=Update.ALL_TYPES,
+            max_connections=self._config.max_connections
+        )
+        logger.info(f"Webhook of {name=} is set to {self.url(name)}")
+
+    def _create_router(self) -> APIRouter:
+        router = APIRouter(prefix=self.PREFIX)
+
+        @router.post('/{name}')
+        async def receive(name: str, request: Request) -> Response:
+            app = self._apps.get(name)
+            if not app:
+                raise HTTPException(status_code=404)
+
+            secret_token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+            if not hmac.compare_digest(secret_token.encode(), self.secret_token(name).encode()):
+                logger.warning(f"Rejected webhook request for {name=} from {request.client}")
+                raise HTTPException(status_code=403)
+
+            update = Update.de_json(await request.json(), app.bot)
+            await app.update_queue.put(update)
+            return Response()
+
+        return router